@@ -6,41 +6,559 @@ and saves the data to an Excel file.
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, UnicodeDammit
+import lxml.html
+from bs4.filter import ElementFilter
+import numpy as np
 import pandas as pd
+import xlsxwriter
 import time
 import re
 from urllib.parse import urljoin, urlparse
 import logging
 import uuid
+import json
+import os
+import hashlib
+import random
+import threading
+import contextlib
+from array import array
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+try:
+    import orjson  # Optional, faster JSON encoding for the JSONL output
+except ImportError:
+    orjson = None
+
+try:
+    import requests_cache  # Optional, on-disk HTTP cache for repeated development runs
+except ImportError:
+    requests_cache = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Column order of the Products sheet
+PRODUCT_COLUMNS = [
+    'product_id', 'category_id', 'vendor_id', 'product_name', 'description', 'country',
+    'weight', 'purity', 'buy_price', 'sell_price', 'slug', 'vat'
+]
+# Products sheet columns; fine_gold is derived from weight and purity when saving
+PRODUCT_SHEET_COLUMNS = [
+    'product_id', 'category_id', 'vendor_id', 'product_name', 'description', 'country',
+    'weight', 'purity', 'fine_gold', 'buy_price', 'sell_price', 'slug', 'vat'
+]
+
+
+@dataclass(slots=True)
+class Product:
+    """A scraped product; the fields are PRODUCT_COLUMNS plus the de-duplication keys, refinery and image URLs kept until it is added."""
+    product_id: int = 0  # Assigned when the product is added, so duplicates never use up an ID
+    category_id: str = ''
+    vendor_id: int | str = ''
+    product_name: str = ''
+    description: str = ''
+    country: str = ''
+    weight: str = ''
+    purity: str = ''
+    buy_price: str = ''
+    sell_price: str = ''
+    slug: str = ''
+    vat: str = ''
+    _norm_name: str = field(default='', repr=False)
+    _norm_weight: str = field(default='', repr=False)
+    _refinery_name: str = field(default='', repr=False)
+    _image_urls: list = field(default_factory=list, repr=False)
+
+
+# Product image filters, matched against the lowercased image URL
+_IMG_INCLUDE = re.compile('|'.join(map(re.escape, [
+    'kyulche', 'moneta', 'zlat', 'srebro', 'platina', 'paladiy',
+    'valcambi', 'pamp', 'argor', 'royal', 'perth', 'krugerrand',
+    'britania', 'eagle', 'philharmonia', 'kangaroo', 'koala', 'panda'
+])))
+_IMG_EXCLUDE = re.compile('|'.join(map(re.escape, [
+    'logo', 'icon', 'banner', 'header', 'footer', 'social', 'facebook',
+    'twitter', 'instagram', 'youtube', 'whatsapp', 'viber', 'email',
+    'phone', 'contact', 'menu', 'nav', 'button', 'arrow', 'close',
+    'loading', 'spinner', 'placeholder', 'default', 'no-image', 'bloomberg'
+])))
+
+# Links that can never be product pages, matched against the lowercased URL before
+# it is fetched (the URL-only part of the skip list in scrape_individual_product)
+_URL_SKIP_RE = re.compile('|'.join(map(re.escape, [
+    'youtube', 'whatsapp', 'zavas', 'blog', 'goo.gl', 'm.me', 'wa.me', 'tel:',
+    'viber://', 'cdn-cgi', 'email-protection', 'contactus'
+])))
+
+# Keywords that mark a page title as a recognizable bullion product
+_RECOGNIZED_PRODUCT_RE = re.compile('|'.join(map(re.escape, [
+    'кюлче', 'монета', 'kyulche', 'moneta', 'гр.', 'toz', 'oz',
+    'valcambi', 'pamp', 'argor-heraeus', 'royal mint', 'perth mint',
+    'кругерранд', 'британия', 'американски орел', 'кленов лист',
+    'филхармония', 'кенгуру', 'коала', 'панда', 'лунар', 'lunar',
+    'платина', 'platina', 'сребро', 'srebro', 'злато', 'zlat'
+])))
+
+# Patterns shared by the product page and product block extractors
+_PRICE_RE = re.compile(r'(\d+\.?\d*)\s*лв')
+_WEIGHT_RE = re.compile(r'(\d+\.?\d*)\s*гр\.')
+_NUMBER_RE = re.compile(r'(\d+\.?\d*)')
+_PURITY_RE = re.compile(r'(\d{3,4}\.?\d*)\s*(?:проба|purity)', re.IGNORECASE)
+_VIEW_MORE_RE = re.compile(r'Вижте повече')
+_SUBCATEGORY_HREF_RE = re.compile(r'/subcategory/')
+
+# Refinery/mint name, first as "<label> <strong>Name</strong>" markup, then as plain text
+_REFINERY_HTML_RES = [
+    re.compile(rf'{re.escape(label)}\s*<strong[^>]*>(.*?)</strong>', re.IGNORECASE | re.DOTALL)
+    for label in ['Монетен двор:', 'Рафинерия:', 'Refinery:', 'Mint:', 'Производител:', 'Manufacturer:']
+]
+_BG_NEXT_FIELDS = r'(?=\s*Тегло|\s*Проба|\s*Чисто|\s*Диаметър|\s*Гурт|\s*Номинал|\s*Валута|\s*Опаковка|\s*Монетата|\s*Снимките|\s*Продаваме|\s*Купуваме|\s*Година|\s*$)'
+_EN_NEXT_FIELDS = r'(?=\s*Weight|\s*Purity|\s*Fine|\s*Diameter|\s*Edge|\s*Nominal|\s*Currency|\s*Packaging|\s*The coin|\s*Images|\s*Sell|\s*Buy|\s*Year|\s*$)'
+_REFINERY_TEXT_RES = [
+    re.compile(r'Монетен двор:\s*([^<\n]+?)' + _BG_NEXT_FIELDS, re.IGNORECASE),  # Stop at next field
+    re.compile(r'Рафинерия:\s*([^<\n]+?)' + _BG_NEXT_FIELDS, re.IGNORECASE),
+    re.compile(r'Refinery:\s*([^<\n]+?)' + _EN_NEXT_FIELDS, re.IGNORECASE),
+    re.compile(r'Mint:\s*([^<\n]+?)' + _EN_NEXT_FIELDS, re.IGNORECASE),
+    re.compile(r'Производител:\s*([^<\n]+?)' + _BG_NEXT_FIELDS, re.IGNORECASE),
+    re.compile(r'Manufacturer:\s*([^<\n]+?)' + _EN_NEXT_FIELDS, re.IGNORECASE)
+]
+_REFINERY_TRAILING_RES = [
+    re.compile(r'\s+(Тегло|Проба|Чисто|Диаметър|Гурт|Номинал|Валута|Опаковка|Монетата|Снимките|Продаваме|Купуваме|Година).*$'),
+    re.compile(r'\s+(Weight|Purity|Fine|Diameter|Edge|Nominal|Currency|Packaging|The coin|Images|Sell|Buy|Year).*$')
+]
+
+# Product block extraction (extract_product_from_block)
+_BLOCK_NAME_RES = [
+    re.compile(r'(\d+\.?\d*\s*гр\.\s*[^0-9]+?)(?=\s*\d+\.?\d*\s*лв|\s*Вижте|\s*$)'),
+    re.compile(r'(Златна Монета[^0-9]+?)(?=\s*\d+\.?\d*\s*гр|\s*\d+\.?\d*\s*лв|\s*Вижте|\s*$)'),
+    re.compile(r'(Златно Кюлче[^0-9]+?)(?=\s*\d+\.?\d*\s*гр|\s*\d+\.?\d*\s*лв|\s*Вижте|\s*$)')
+]
+_BLOCK_STATUS_RES = [
+    re.compile(pattern) for pattern in [
+        r'Изчерпани\..*',
+        r'Поръчайте авансово.*',
+        r'Налични.*',
+        r'ниско качество.*',
+        r'с повреди.*',
+        r'сив.*',
+        r'лунар.*',
+        r'прасе.*',
+        r'\(\s*\+?\d+\s*лв\.?\s*\)',
+        r'\(\s*-?\d+\s*лв\.?\s*\)'
+    ]
+]
+# One pass over the block text for prices, weight, purity and Swiss refinery names; the alternatives never overlap
+_BLOCK_TOKEN_RE = re.compile(
+    r'(?P<price>\d+\.?\d*)\s*лв'
+    r'|(?P<weight>\d+\.?\d*)\s*гр\.'
+    r'|(?P<purity>\d{3,4}\.?\d*)\s*(?i:проба|purity)'
+    r'|(?P<swiss>Valcambi|Argor[- ]Heraeus|Pamp)'
+)
+_STATUS_DIV_STYLE_RE = re.compile(r'margin-top.*margin-bottom')
+_STATUS_SPAN_STYLE_RE = re.compile(r'color.*font-size')
+
+# Product block validation (is_valid_product_block), matched against lowercased block text
+_BLOCK_EXCLUDE_RE = re.compile('|'.join(map(re.escape, [
+    'безплатна доставка',
+    'застраховка на пратка',
+    'консултация',
+    'за контакти',
+    'ако бързате',
+    'общи условия',
+    'политика за поверителност',
+    'разбрах',
+    'igold в медиите',
+    'facebook live',
+    'защо да инвестираме',
+    'защо да купите злато от igold'
+])))
+_BLOCK_PRODUCT_KEYWORD_RE = re.compile('|'.join(map(re.escape, [
+    'златно кюлче', 'златна монета', 'сребърно кюлче', 'сребърна монета',
+    'кюлче платина', 'кюлче паладий', 'valcambi', 'pamp', 'argor-heraeus',
+    'кругерранд', 'британия', 'американски орел', 'канадски кленов лист',
+    'виенска филхармония', 'австралийско кенгуру', 'монета', 'кюлче',
+    'франка', 'лири', 'долар', 'евро', 'рупия', 'реал', 'йена'
+])))
+_BLOCK_COIN_RE = re.compile('|'.join(map(re.escape, ['монета', 'франка', 'лири', 'долар', 'евро'])))
+
+# Lines that cannot be a product name when falling back to line-by-line name detection:
+# status text (matched case-sensitively) and site boilerplate (matched against the lowercased line)
+_NAME_LINE_STATUS_RE = re.compile('|'.join(map(re.escape, [
+    'Вижте', 'Изчерпани', 'Поръчайте авансово', 'Налични', 'ниско качество',
+    'с повреди', 'сив', 'лунар', 'прасе'
+])))
+_NAME_LINE_EXCLUDE_RE = re.compile('|'.join(map(re.escape, [
+    'купуваме', 'продаваме', 'за вас', 'контакти', 'общи условия', 'продаваме злато',
+    'отстъпка', 'защо да купите', 'конкурентни цени', 'добри наличности', 'актуализация',
+    'само световно', 'достъпна и дискретна', 'безплатна доставка', 'facebook live',
+    'igold в медиите'
+])))
+
+# Price text on a product details page (scrape_product_details)
+_DETAILS_PRICE_RE = re.compile(r'[\d,]+\.?\d*\s*лв')
+_UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+
+def _page_text(content):
+    """Visible text of a whole page joined like get_text(' ', strip=True), read straight off an lxml tree."""
+    # Decoded the way BeautifulSoup would, so pages without a charset declaration still read correctly
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    root = lxml.html.document_fromstring(markup.encode('utf-8'), parser=_UTF8_HTML_PARSER)
+    texts = root.xpath('//text()[not(ancestor::script or ancestor::style)]')
+    return ' '.join(text for text in map(str.strip, texts) if text)
+
+
+# Product page elements picked up by _collect_product_fields: heading tags by name,
+# the rest by CSS class (mapped to the tag name they must have, or None for any tag)
+_PRODUCT_FIELD_TAGS = ('title', 'h1', 'h2')
+_PRODUCT_FIELD_CLASSES = {
+    'productUpdatePriceBuy': 'span',
+    'productUpdatePriceSell': 'span',
+    'descriptionOnly': None
+}
+
+
+def _collect_product_fields(soup):
+    """Return the first title/h1/h2, price span and description element of a product page, found in one tree walk."""
+    fields = {}
+    for tag in soup.find_all(True):
+        if tag.name in _PRODUCT_FIELD_TAGS:
+            fields.setdefault(tag.name, tag)
+        for css_class in tag.get('class') or ():
+            if css_class in _PRODUCT_FIELD_CLASSES and _PRODUCT_FIELD_CLASSES[css_class] in (None, tag.name):
+                fields.setdefault(css_class, tag)
+    return fields
+
+
+def _class_names(value):
+    """CSS class names of a class attribute value; at parse time it is still a single unsplit string."""
+    if value is None:
+        return ()
+    return value.split() if isinstance(value, str) else value
+
+
+def _has_class(css_class):
+    """SoupStrainer attribute matcher for one CSS class."""
+    def match(value):
+        return css_class in _class_names(value)
+    return match
+
+
+# Parse only the parts of listing pages that are actually read
+_PRODUCT_ITEM_STRAINER = SoupStrainer('li', class_=_has_class('kv__member-item'))
+
+
+class _MenuFilter(ElementFilter):
+    """parse_only filter keeping the menu-product-types-box div and any li/div with a rootcategoryid, each with everything inside it."""
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        if name == 'div' and 'menu-product-types-box' in _class_names(attrs.get('class')):
+            return True
+        # get_categories reads a link's category id from an enclosing li/div, which may wrap the menu box itself
+        return name in ('li', 'div') and 'rootcategoryid' in attrs
+
+    def allow_string_creation(self, string):
+        return False
+
+
+_MENU_FILTER = _MenuFilter()
+
+
+class _SubcategoryFilter(ElementFilter):
+    """parse_only filter keeping a category page's sub-category-<id> div and its /subcategory/ links."""
+
+    def __init__(self, category_id):
+        super().__init__()
+        self.div_id = f'sub-category-{category_id}'
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        return attrs.get('id') == self.div_id or (name == 'a' and '/subcategory/' in (attrs.get('href') or ''))
+
+    def allow_string_creation(self, string):
+        return False
+
+
+def _block_text(block):
+    """block.get_text(strip=True) without the status divs/spans, skipping those subtrees instead of copying and decomposing."""
+    string_types = block.interesting_string_types
+    if isinstance(string_types, type):
+        string_types = (string_types,)
+    parts = []
+    stack = [iter(block.children)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+        elif isinstance(child, NavigableString):
+            if type(child) in string_types:
+                text = child.strip()
+                if text:
+                    parts.append(text)
+        elif child.name == 'div' and _STATUS_DIV_STYLE_RE.search(child.get('style', '')):
+            continue
+        elif child.name == 'span' and _STATUS_SPAN_STYLE_RE.search(child.get('style', '')):
+            continue
+        else:
+            stack.append(iter(child.children))
+    return ''.join(parts)
+
+
+def _normalize_product(product):
+    """Store the lowercased name and stripped weight used for de-duplication, once, when the product is accepted."""
+    product._norm_name = product.product_name.lower().strip()
+    product._norm_weight = product.weight.strip()
+
+
+def _public_fields(product):
+    """The product's output columns as a dict, without the internal de-duplication keys."""
+    return {key: getattr(product, key) for key in PRODUCT_COLUMNS}
+
+
+def _product_key(product):
+    """Identity of a product for duplicate detection, tagged so slug and name+weight keys never collide."""
+    product_slug = product.slug.strip()
+    if product_slug:
+        return ('slug', product_slug)
+    return ('name_weight', product._norm_name, product._norm_weight)
+
+
+def _shingles(text, size=3):
+    """Character shingles of whitespace-normalized, lowercased text."""
+    text = ' '.join(text.lower().split())
+    return {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+
+
+class _NearDuplicateIndex:
+    """MinHash signatures bucketed by LSH bands, to find near-duplicate names without comparing every pair."""
+
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, threshold=0.85, num_perm=64, bands=8):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(0)  # Fixed seed keeps results reproducible between runs
+        self.permutations = [(rng.randrange(1, self._PRIME), rng.randrange(self._PRIME)) for _ in range(num_perm)]
+        self.buckets = defaultdict(list)
+        self.signatures = []
+
+    def _signature(self, text):
+        hashes = [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big') for shingle in _shingles(text)]
+        return tuple(min((a * h + b) % self._PRIME for h in hashes) for a, b in self.permutations)
+
+    def add(self, text, group=''):
+        """Return True if text nearly matches one already added in the same group, otherwise index it and return False."""
+        signature = self._signature(text)
+        band_keys = [(group, band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+        
+        candidates = set()
+        for band_key in band_keys:
+            candidates.update(self.buckets.get(band_key, ()))
+        for candidate in candidates:
+            # Fraction of equal MinHash values estimates the Jaccard similarity of the shingle sets
+            other = self.signatures[candidate]
+            if sum(x == y for x, y in zip(signature, other)) / len(signature) >= self.threshold:
+                return True
+        
+        self.signatures.append(signature)
+        for band_key in band_keys:
+            self.buckets[band_key].append(len(self.signatures) - 1)
+        return False
+
+
+class _ProductDetailsFilter(ElementFilter):
+    """parse_only filter keeping what scrape_product_details reads: the heading, images, detail tables/lists and detail blocks."""
+
+    TAGS = frozenset(['h1', 'img', 'table', 'dl'])
+    CLASSES = frozenset([
+        'product-details', 'details', 'specifications', 'product-info', 'description',
+        'productUpdatePriceBuy', 'productUpdatePriceSell'
+    ])
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        if name in self.TAGS:
+            return True
+        return not self.CLASSES.isdisjoint(_class_names((attrs or {}).get('class')))
+
+    def allow_string_creation(self, string):
+        return False
+
+
+_PRODUCT_DETAILS_FILTER = _ProductDetailsFilter()
+
+
+def _jsonl_line(record):
+    """Encode one record as a UTF-8 JSON Lines entry."""
+    if orjson is not None:
+        return orjson.dumps(record) + b'\n'
+    return json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def _append_row(columns, **values):
+    """Append one row to a column-oriented table (dict of column name -> list/array)."""
+    for name, value in values.items():
+        columns[name].append(value)
+
+
+def _row_count(columns):
+    """Number of rows in a column-oriented table."""
+    return len(next(iter(columns.values())))
+
+
+def _fine_gold_column(products):
+    """Fine metal content (weight * purity / 1000) of every product in one vectorized pass, as "7.98 гр." or ''."""
+    weight = pd.Series([product.weight for product in products], dtype=object)
+    purity = pd.Series([product.purity for product in products], dtype=object)
+    weight = pd.to_numeric(weight.str.extract(r'(\d+\.?\d*)', expand=False), errors='coerce')
+    purity = pd.to_numeric(purity, errors='coerce')
+    fine_gold = (weight * purity / 1000).to_numpy(dtype=float)
+    known = ~np.isnan(fine_gold)
+    column = np.full(len(products), '', dtype=object)
+    if known.any():
+        column[known] = np.char.mod('%.2f гр.', fine_gold[known])
+    return column.tolist()
+
+
+def _write_sheet(workbook, sheet_name, columns, rows):
+    """Write a header row and then each row in order; constant_memory worksheets only accept rows top to bottom."""
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, columns)
+    for row_number, row in enumerate(rows, 1):
+        worksheet.write_row(row_number, 0, row)
+
+
 class IGoldScraper:
-    def __init__(self):
+    def __init__(self, max_workers=8, min_request_interval=0.25, jsonl_dir=None, near_duplicate_threshold=None,
+                 cache_name=None, cache_expire_after=3600):
         self.base_url = "https://igold.bg"
-        self.session = requests.Session()
+        self._base_prefix = self.base_url.rstrip('/')
+        self.max_workers = max_workers  # Product pages fetched concurrently
+        self.min_request_interval = min_request_interval  # Seconds between request starts, across all threads
+        self.session = self._create_session(cache_name, cache_expire_after)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # One pooled connection per worker thread
+        adapter = HTTPAdapter(pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.categories = []
         self.subcategories = []
         self.products = []
-        self.images = []
+        # Images and vendors are append-only, so they are kept column-oriented and
+        # streamed to Excel as-is when saving instead of being rebuilt from row dicts
+        self.images = {'product_id': array('l'), 'image_url': [], 'image_order': array('l')}
         self.product_counter = 0
-        self.vendors = []
+        self.vendors = {'vendor_id': array('l'), 'name': [], 'country': []}
+        self.vendor_ids = {}  # Lowercased vendor name -> vendor_id
         self.vendor_counter = 0
         self.processed_urls = set()  # Track processed product URLs to avoid duplicates
+        self._scheduled_urls = set()  # Product URLs already queued for scraping
+        self.listing_urls = set()  # Category/subcategory page URLs (without trailing slash), never product pages
+        # Products are de-duplicated as they are added: by slug, or name + weight without one
+        self._seen_keys = set()
+        self.duplicate_count = 0
+        # When set, _add_product also drops products whose names are this similar
+        # (estimated Jaccard similarity of character shingles) to an earlier product with the same weight
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._near_duplicates = _NearDuplicateIndex(near_duplicate_threshold) if near_duplicate_threshold else None
+        self._lock = threading.Lock()  # Guards the shared state above when scraping from worker threads
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
         
+        # Optionally write every product, image and vendor to <jsonl_dir>/<table>.jsonl
+        # as soon as it is scraped, so partial results survive an interrupted run.
+        # Rows are still kept in memory as well, for de-duplication and the Excel export.
+        self._jsonl_files = None
+        if jsonl_dir:
+            os.makedirs(jsonl_dir, exist_ok=True)
+            with contextlib.ExitStack() as stack:  # If one file fails to open, close the others
+                self._jsonl_files = {
+                    name: stack.enter_context(open(os.path.join(jsonl_dir, f'{name}.jsonl'), 'wb', buffering=1 << 20))
+                    for name in ('products', 'images', 'vendors')
+                }
+                stack.pop_all()
         
+    @staticmethod
+    def _create_session(cache_name, expire_after):
+        """Plain requests session, or a requests-cache session backed by <cache_name>.sqlite when cache_name is set."""
+        if not cache_name:
+            return requests.Session()
+        if requests_cache is None:
+            logger.warning("requests-cache is not installed; fetching pages without a cache")
+            return requests.Session()
+        logger.info(f"Caching pages in {cache_name}.sqlite for {expire_after} seconds")
+        return requests_cache.CachedSession(cache_name, backend='sqlite', expire_after=expire_after,
+                                            allowable_methods=('GET',))
+    
+    def _cached_page(self, url):
+        """The page cache's response for a GET of url, or None if it has none that has not expired; never sends a request."""
+        if getattr(self.session, 'cache', None) is None:
+            return None
+        # requests-cache answers a miss, including an expired entry, with a 504 instead of fetching
+        response = self.session.get(url, only_if_cached=True)
+        return None if response.status_code == 504 else response
+        
+    def _write_jsonl(self, name, record):
+        """Append a record to the JSONL output for the given table, if enabled."""
+        if self._jsonl_files is not None:
+            self._jsonl_files[name].write(_jsonl_line(record))
+    
+    def close_jsonl(self):
+        """Flush and close the JSONL output files; safe to call more than once."""
+        if self._jsonl_files is not None:
+            files, self._jsonl_files = self._jsonl_files, None
+            with contextlib.ExitStack() as stack:  # Close every file even if flushing one fails
+                for fp in files.values():
+                    stack.callback(fp.close)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_jsonl()
+        
+    def _throttle(self):
+        """Wait for this thread's turn so requests start at most once per min_request_interval."""
+        with self._throttle_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self.min_request_interval
+        if start_at > now:
+            time.sleep(start_at - now)
+        
+    def _absolutize(self, href):
+        """Make a link absolute; root-relative links (the common case) skip urljoin."""
+        if href.startswith('http'):
+            return href
+        if href.startswith('/') and not href.startswith('//'):
+            return self._base_prefix + href
+        return urljoin(self.base_url, href)
+    
+    def _slug(self, url):
+        """URL path without the leading slash; plain links on our own host skip urlparse."""
+        if url.startswith(self._base_prefix + '/') and '?' not in url and '#' not in url:
+            return url[len(self._base_prefix):].lstrip('/')
+        return urlparse(url).path.lstrip('/')
+    
     def get_page(self, url, max_retries=3):
         """Get a web page with error handling and retries."""
         for attempt in range(max_retries):
             try:
                 logger.info(f"Fetching: {url}")
-                response = self.session.get(url, timeout=10)
+                # Cached pages never reach the server, so they skip the throttle
+                response = self._cached_page(url)
+                if response is None:
+                    self._throttle()
+                    response = self.session.get(url, timeout=10)
                 response.raise_for_status()
                 return response
             except requests.RequestException as e:
@@ -58,7 +576,7 @@ class IGoldScraper:
         if not response:
             return []
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=_MENU_FILTER)
         categories = []
         
         # Look specifically for the menu-product-types-box div
@@ -72,8 +590,8 @@ class IGoldScraper:
                     url = link.get('href', '')
                     
                     # Make URL absolute if it's relative
-                    if url and not url.startswith('http'):
-                        url = urljoin(self.base_url, url)
+                    if url:
+                        url = self._absolutize(url)
                     
                     if name and url:
                         # Try to extract category ID from URL or parent elements
@@ -104,6 +622,7 @@ class IGoldScraper:
                                 'name': name,
                                 'url': url
                             })
+                            self.listing_urls.add(url.rstrip('/'))
                             logger.info(f"Found category: {name} (ID: {category_id})")
                 except Exception as e:
                     logger.warning(f"Error processing category item: {e}")
@@ -132,8 +651,9 @@ class IGoldScraper:
         if not response:
             return []
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=_SubcategoryFilter(category_id))
         subcategories = []
+        subcategory_urls = set()  # URLs in subcategories, for O(1) duplicate checks
         
         # Look for subcategory div with the specific ID pattern
         subcategory_div = soup.find('div', id=f'sub-category-{category_id}')
@@ -144,8 +664,8 @@ class IGoldScraper:
                     name = link.get_text(strip=True)
                     url = link.get('href', '')
                     
-                    if url and not url.startswith('http'):
-                        url = urljoin(self.base_url, url)
+                    if url:
+                        url = self._absolutize(url)
                     
                     if name and url:
                         subcategories.append({
@@ -154,35 +674,38 @@ class IGoldScraper:
                             'url': url,
                             'parent_category_id': category_id
                         })
+                        subcategory_urls.add(url)
                         logger.info(f"Found subcategory: {name}")
                 except Exception as e:
                     logger.warning(f"Error processing subcategory: {e}")
                     continue
         
         # Also look for other subcategory patterns
-        subcategory_links = soup.find_all('a', href=re.compile(r'/subcategory/'))
+        subcategory_links = soup.find_all('a', href=_SUBCATEGORY_HREF_RE)
         for link in subcategory_links:
             try:
                 name = link.get_text(strip=True)
                 url = link.get('href', '')
                 
-                if url and not url.startswith('http'):
-                    url = urljoin(self.base_url, url)
+                if url:
+                    url = self._absolutize(url)
                 
                 if name and url:
                     # Check if we already have this subcategory
-                    if not any(sub['url'] == url for sub in subcategories):
+                    if url not in subcategory_urls:
                         subcategories.append({
                             'id': len(subcategories) + 1,
                             'name': name,
                             'url': url,
                             'parent_category_id': category_id
                         })
+                        subcategory_urls.add(url)
                         logger.info(f"Found subcategory from links: {name}")
             except Exception as e:
                 logger.warning(f"Error processing subcategory link: {e}")
                 continue
         
+        self.listing_urls.update(url.rstrip('/') for url in subcategory_urls)
         logger.info(f"Found {len(subcategories)} subcategories for category {category_id}")
         return subcategories
     
@@ -194,8 +717,8 @@ class IGoldScraper:
         if not response:
             return []
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        product_links = set()  # Use set to avoid duplicates
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=_PRODUCT_ITEM_STRAINER)
+        product_links = {}  # Dict keys avoid duplicates and keep page order
 
         # Look specifically for li.kv__member-item containers (the main product containers)
         product_containers = soup.find_all('li', class_='kv__member-item')
@@ -203,27 +726,27 @@ class IGoldScraper:
         
         for container in product_containers:
             # Look for "Вижте повече" links within each container
-            view_more_links = container.find_all('a', string=re.compile(r'Вижте повече'))
+            view_more_links = container.find_all('a', string=_VIEW_MORE_RE)
             for link in view_more_links:
                 href = link.get('href', '')
                 if href:
-                    if not href.startswith('http'):
-                        href = urljoin(self.base_url, href)
-                    product_links.add(href)
+                    href = self._absolutize(href)
+                    if not _URL_SKIP_RE.search(href.lower()):
+                        product_links[href] = None
             
             # Also look for any other links within the container
             all_links = container.find_all('a')
             for link in all_links:
                 href = link.get('href', '')
                 if href and href not in product_links:
-                    if not href.startswith('http'):
-                        href = urljoin(self.base_url, href)
+                    href = self._absolutize(href)
                     # Only add if it looks like a product link
-                    if any(keyword in href.lower() for keyword in ['kyulche', 'moneta', 'platina', 'paladiy', 'srebro', 'zlat']):
-                        product_links.add(href)
+                    href_lower = href.lower()
+                    if any(keyword in href_lower for keyword in ['kyulche', 'moneta', 'platina', 'paladiy', 'srebro', 'zlat']) and not _URL_SKIP_RE.search(href_lower):
+                        product_links[href] = None
 
-        # Convert set back to list and sort for consistent ordering
-        product_links = sorted(list(product_links))
+        # Keep the order the links appear on the page
+        product_links = list(product_links)
         
         logger.info(f"Found {len(product_links)} unique product links from {url}")
         return product_links
@@ -231,9 +754,22 @@ class IGoldScraper:
     def scrape_individual_product(self, product_url, category_id=None, subcategory_id=None):
         """Scrape detailed product information from an individual product page."""
         # Check if we've already processed this URL
-        if product_url in self.processed_urls:
+        with self._lock:
+            already_processed = product_url in self.processed_urls
+        if already_processed:
             logger.info(f"Skipping duplicate product URL: {product_url}")
             return None
+        
+        # Don't fetch links that can never be product pages
+        product_url_lower = product_url.lower()
+        if _URL_SKIP_RE.search(product_url_lower):
+            logger.info(f"Skipping non-product URL: {product_url}")
+            return None
+        
+        # Category and subcategory listings are linked from product containers too
+        if product_url.rstrip('/') in self.listing_urls or '/promotzii' in product_url_lower:
+            logger.info(f"Skipping listing page URL: {product_url}")
+            return None
             
         logger.info(f"Scraping individual product: {product_url}")
 
@@ -241,67 +777,58 @@ class IGoldScraper:
         if not response:
             return None
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        return self.parse_product_page(response.content, product_url, category_id)
+
+    def parse_product_page(self, content, product_url, category_id=None):
+        """Extract product data from an already fetched product page; no network access."""
+        soup = BeautifulSoup(content, 'lxml')
         
-        self.product_counter += 1
-        product_data = {
-                'product_id': self.product_counter,
-                'category_id': category_id or '',
-                'vendor_id': '',
-                'product_name': '',
-                'description': '',
-                'country': '',
-                'weight': '',
-                'purity': '',
-                'buy_price': '',
-                'sell_price': '',
-                'slug': '',
-                'vat': ''
-            }
+        product_data = Product(category_id=category_id or '')
 
         try:
             # Extract product URL - only slug without domain
-            from urllib.parse import urlparse
-            parsed_url = urlparse(product_url)
-            product_data['slug'] = parsed_url.path.lstrip('/')
+            product_data.slug = self._slug(product_url)
             
             # Set VAT based on category
             if category_id == '1':  # Злато
-                product_data['vat'] = 'без ддс'
+                product_data.vat = 'без ддс'
             elif category_id == '2':  # Сребро
-                product_data['vat'] = 'с ддс на маржа'
+                product_data.vat = 'с ддс на маржа'
             else:  # Останалите категории (Платина, Паладий)
-                product_data['vat'] = 'с ддс'
+                product_data.vat = 'с ддс'
             
+            # Find title, headings, price spans and description in a single pass
+            fields = _collect_product_fields(soup)
+
             # Extract product name from page title or main heading
-            title = soup.find('title')
+            title = fields.get('title')
             if title:
-                product_data['product_name'] = title.get_text(strip=True)
+                product_data.product_name = title.get_text(strip=True)
             
             # Try to find main product heading
-            main_heading = soup.find('h1') or soup.find('h2')
+            main_heading = fields.get('h1') or fields.get('h2')
             if main_heading:
-                product_data['product_name'] = main_heading.get_text(strip=True)
+                product_data.product_name = main_heading.get_text(strip=True)
 
             # Extract description from class descriptionOnly - keep HTML tags
-            description_element = soup.find(class_='descriptionOnly')
+            description_element = fields.get('descriptionOnly')
             if description_element:
-                product_data['description'] = str(description_element)
+                product_data.description = str(description_element)
 
             # Extract all text content for analysis
             page_text = soup.get_text(strip=True)
+            page_text_lower = page_text.lower()
 
             # Try to extract refinery/mint information from HTML structure
             # Look for patterns like "Монетен двор: <strong>Vendor Name</strong>"
             extracted_refinery_name = ''
             
             # First, try to find structured HTML patterns
-            refinery_labels = ['Монетен двор:', 'Рафинерия:', 'Refinery:', 'Mint:', 'Производител:', 'Manufacturer:']
+            page_html = str(soup)  # Serialize once, not once per label
             
-            for label in refinery_labels:
+            for pattern in _REFINERY_HTML_RES:
                 # Look for the label followed by a strong tag
-                pattern = rf'{re.escape(label)}\s*<strong[^>]*>(.*?)</strong>'
-                match = re.search(pattern, str(soup), re.IGNORECASE | re.DOTALL)
+                match = pattern.search(page_html)
                 if match:
                     extracted_refinery_name = match.group(1).strip()
                     # Clean up HTML entities and extra whitespace
@@ -312,66 +839,57 @@ class IGoldScraper:
             
             # If no structured HTML found, try text patterns as fallback
             if not extracted_refinery_name:
-                refinery_patterns = [
-                    r'Монетен двор:\s*([^<\n]+?)(?=\s*Тегло|\s*Проба|\s*Чисто|\s*Диаметър|\s*Гурт|\s*Номинал|\s*Валута|\s*Опаковка|\s*Монетата|\s*Снимките|\s*Продаваме|\s*Купуваме|\s*Година|\s*$)',  # Stop at next field
-                    r'Рафинерия:\s*([^<\n]+?)(?=\s*Тегло|\s*Проба|\s*Чисто|\s*Диаметър|\s*Гурт|\s*Номинал|\s*Валута|\s*Опаковка|\s*Монетата|\s*Снимките|\s*Продаваме|\s*Купуваме|\s*Година|\s*$)',  # Stop at next field
-                    r'Refinery:\s*([^<\n]+?)(?=\s*Weight|\s*Purity|\s*Fine|\s*Diameter|\s*Edge|\s*Nominal|\s*Currency|\s*Packaging|\s*The coin|\s*Images|\s*Sell|\s*Buy|\s*Year|\s*$)',  # Stop at next field
-                    r'Mint:\s*([^<\n]+?)(?=\s*Weight|\s*Purity|\s*Fine|\s*Diameter|\s*Edge|\s*Nominal|\s*Currency|\s*Packaging|\s*The coin|\s*Images|\s*Sell|\s*Buy|\s*Year|\s*$)',  # Stop at next field
-                    r'Производител:\s*([^<\n]+?)(?=\s*Тегло|\s*Проба|\s*Чисто|\s*Диаметър|\s*Гурт|\s*Номинал|\s*Валута|\s*Опаковка|\s*Монетата|\s*Снимките|\s*Продаваме|\s*Купуваме|\s*Година|\s*$)',  # Stop at next field
-                    r'Manufacturer:\s*([^<\n]+?)(?=\s*Weight|\s*Purity|\s*Fine|\s*Diameter|\s*Edge|\s*Nominal|\s*Currency|\s*Packaging|\s*The coin|\s*Images|\s*Sell|\s*Buy|\s*Year|\s*$)'  # Stop at next field
-                ]
-                
-                for pattern in refinery_patterns:
-                    match = re.search(pattern, page_text, re.IGNORECASE)
+                for pattern in _REFINERY_TEXT_RES:
+                    match = pattern.search(page_text)
                     if match:
                         extracted_refinery_name = match.group(1).strip()
                         # Clean up the extracted name - remove any trailing text that might have been captured
                         if extracted_refinery_name:
                             # Remove common trailing words/phrases
-                            extracted_refinery_name = re.sub(r'\s+(Тегло|Проба|Чисто|Диаметър|Гурт|Номинал|Валута|Опаковка|Монетата|Снимките|Продаваме|Купуваме|Година).*$', '', extracted_refinery_name)
-                            extracted_refinery_name = re.sub(r'\s+(Weight|Purity|Fine|Diameter|Edge|Nominal|Currency|Packaging|The coin|Images|Sell|Buy|Year).*$', '', extracted_refinery_name)
+                            for trailing_re in _REFINERY_TRAILING_RES:
+                                extracted_refinery_name = trailing_re.sub('', extracted_refinery_name)
                             extracted_refinery_name = extracted_refinery_name.strip()
                             if extracted_refinery_name:
                                 break
 
             # Extract weight - only numeric value
-            weight_match = re.search(r'(\d+\.?\d*)\s*гр\.', page_text)
+            weight_match = _WEIGHT_RE.search(page_text)
             if weight_match:
-                product_data['weight'] = weight_match.group(1)
+                product_data.weight = weight_match.group(1)
 
             # Extract prices using new CSS classes - only numeric values
-            buy_price_element = soup.find('span', class_='productUpdatePriceBuy')
-            sell_price_element = soup.find('span', class_='productUpdatePriceSell')
+            buy_price_element = fields.get('productUpdatePriceBuy')
+            sell_price_element = fields.get('productUpdatePriceSell')
             
             if buy_price_element:
                 buy_price_text = buy_price_element.get_text(strip=True)
                 # Extract only the numeric part, remove "лв." and any other text
-                buy_price_match = re.search(r'(\d+\.?\d*)', buy_price_text)
+                buy_price_match = _NUMBER_RE.search(buy_price_text)
                 if buy_price_match:
-                    product_data['buy_price'] = buy_price_match.group(1)
+                    product_data.buy_price = buy_price_match.group(1)
             
             if sell_price_element:
                 sell_price_text = sell_price_element.get_text(strip=True)
                 # Extract only the numeric part, remove "лв." and any other text
-                sell_price_match = re.search(r'(\d+\.?\d*)', sell_price_text)
+                sell_price_match = _NUMBER_RE.search(sell_price_text)
                 if sell_price_match:
-                    product_data['sell_price'] = sell_price_match.group(1)
+                    product_data.sell_price = sell_price_match.group(1)
             
             # Fallback to old method if new CSS classes not found
-            if not product_data['buy_price'] and not product_data['sell_price']:
-                price_matches = re.findall(r'(\d+\.?\d*)\s*лв', page_text)
+            if not product_data.buy_price and not product_data.sell_price:
+                price_matches = _PRICE_RE.findall(page_text)
                 if len(price_matches) >= 2:
-                    product_data['buy_price'] = price_matches[0]
-                    product_data['sell_price'] = price_matches[1]
+                    product_data.buy_price = price_matches[0]
+                    product_data.sell_price = price_matches[1]
                 elif len(price_matches) == 1:
-                    product_data['buy_price'] = price_matches[0]
+                    product_data.buy_price = price_matches[0]
 
             # Look for 0 prices specifically
             if '0 лв' in page_text or '0.00 лв' in page_text:
-                if not product_data['buy_price']:
-                    product_data['buy_price'] = '0'
-                if not product_data['sell_price']:
-                    product_data['sell_price'] = '0'
+                if not product_data.buy_price:
+                    product_data.buy_price = '0'
+                if not product_data.sell_price:
+                    product_data.sell_price = '0'
 
             # Extract country/refinery information
             refinery_name = ''
@@ -431,62 +949,41 @@ class IGoldScraper:
             
             # Set country and vendor
             if refinery_name:
-                product_data['country'] = country
+                product_data.country = country
                 
-                # Get or create vendor and set vendor_id
-                vendor_id = self.get_or_create_vendor(refinery_name, country)
-                product_data['vendor_id'] = vendor_id
+                # The vendor is looked up or created, and vendor_id set, when the product is added
+                product_data._refinery_name = refinery_name
 
             # Extract purity
-            purity_match = re.search(r'(\d{3,4}\.?\d*)\s*(?:проба|purity)', page_text, re.IGNORECASE)
+            purity_match = _PURITY_RE.search(page_text)
             if purity_match:
-                product_data['purity'] = purity_match.group(1)
-            elif 'злато' in page_text.lower() or 'gold' in page_text.lower():
-                product_data['purity'] = '999.9'
-            elif 'сребро' in page_text.lower() or 'silver' in page_text.lower():
-                product_data['purity'] = '999.0'
+                product_data.purity = purity_match.group(1)
+            elif 'злато' in page_text_lower or 'gold' in page_text_lower:
+                product_data.purity = '999.9'
+            elif 'сребро' in page_text_lower or 'silver' in page_text_lower:
+                product_data.purity = '999.0'
 
             # Extract images - only product images
             images = soup.find_all('img')
             product_image_urls = []
             for img in images:
                 img_src = img.get('src', '')
-                if img_src and not img_src.startswith('http'):
-                    img_src = urljoin(self.base_url, img_src)
+                if img_src:
+                    img_src = self._absolutize(img_src)
                 
                 # Only include actual product images
-                if img_src and any(product_indicator in img_src.lower() for product_indicator in [
-                    'kyulche', 'moneta', 'zlat', 'srebro', 'platina', 'paladiy', 
-                    'valcambi', 'pamp', 'argor', 'royal', 'perth', 'krugerrand',
-                    'britania', 'eagle', 'philharmonia', 'kangaroo', 'koala', 'panda'
-                ]) and not any(exclude in img_src.lower() for exclude in [
-                    'logo', 'icon', 'banner', 'header', 'footer', 'social', 'facebook', 
-                    'twitter', 'instagram', 'youtube', 'whatsapp', 'viber', 'email',
-                    'phone', 'contact', 'menu', 'nav', 'button', 'arrow', 'close',
-                    'loading', 'spinner', 'placeholder', 'default', 'no-image', 'bloomberg'
-                ]):
+                img_src_lower = img_src.lower()
+                if img_src and _IMG_INCLUDE.search(img_src_lower) and not _IMG_EXCLUDE.search(img_src_lower):
                     product_image_urls.append(img_src)
                     logger.info(f"Found product image: {img_src}")
 
-            # Store images in images list (no longer in product_data)
-            if len(product_image_urls) >= 1:
-                self.images.append({
-                    'product_id': product_data['product_id'],
-                    'image_url': product_image_urls[0],
-                    'image_order': 1
-                })
-                logger.info(f"Added product image 1 for product {product_data['product_id']}: {product_image_urls[0]}")
-            if len(product_image_urls) >= 2:
-                self.images.append({
-                    'product_id': product_data['product_id'],
-                    'image_url': product_image_urls[1],
-                    'image_order': 2
-                })
-                logger.info(f"Added product image 2 for product {product_data['product_id']}: {product_image_urls[1]}")
+            # Images go to the images table when the product is added (no longer in product_data)
+            product_data._image_urls = product_image_urls[:2]
 
 
             # Filter out non-product pages
-            product_name = product_data['product_name'].lower()
+            product_name = product_data.product_name.lower()
+            product_url_lower = product_url.lower()
             
             # Skip non-product pages
             skip_keywords = [
@@ -503,35 +1000,31 @@ class IGoldScraper:
             # Check if this is a real product
             is_real_product = True
             for keyword in skip_keywords:
-                if keyword in product_name or keyword in product_url.lower():
+                if keyword in product_name or keyword in product_url_lower:
                     is_real_product = False
                     break
             
                 # Additional checks for real products
                 if is_real_product:
                     # Must have weight or be a recognizable product type
-                    has_weight = bool(product_data['weight'])
-                    is_recognized_product = any(keyword in product_name for keyword in [
-                        'кюлче', 'монета', 'kyulche', 'moneta', 'гр.', 'toz', 'oz',
-                        'valcambi', 'pamp', 'argor-heraeus', 'royal mint', 'perth mint',
-                        'кругерранд', 'британия', 'американски орел', 'кленов лист',
-                        'филхармония', 'кенгуру', 'коала', 'панда', 'лунар', 'lunar',
-                        'платина', 'platina', 'сребро', 'srebro', 'злато', 'zlat'
-                    ])
+                    has_weight = bool(product_data.weight)
+                    is_recognized_product = bool(_RECOGNIZED_PRODUCT_RE.search(product_name))
                     
                     # For platinum products, be more lenient - if it has a name and is from a product URL, accept it
-                    if category_id == 3 and product_data['product_name']:  # Platinum category
+                    if category_id == 3 and product_data.product_name:  # Platinum category
                         is_real_product = True
                     elif not (has_weight or is_recognized_product):
                         is_real_product = False
             
                 # Only return if it's a real product
-                if is_real_product and product_data['product_name']:
+                if is_real_product and product_data.product_name:
+                    _normalize_product(product_data)
                     # Mark this URL as processed
-                    self.processed_urls.add(product_url)
+                    with self._lock:
+                        self.processed_urls.add(product_url)
                     return product_data
                 else:
-                    logger.warning(f"Product filtered out - is_real_product: {is_real_product}, has_name: {bool(product_data['product_name'])}, name: '{product_data['product_name']}'")
+                    logger.warning(f"Product filtered out - is_real_product: {is_real_product}, has_name: {bool(product_data.product_name)}, name: '{product_data.product_name}'")
                     return None
 
         except Exception as e:
@@ -539,6 +1032,52 @@ class IGoldScraper:
             logger.warning(f"Product URL: {product_url}")
             return None
 
+    def _scrape_product_safely(self, product_url, category_id=None, subcategory_id=None):
+        """scrape_individual_product for the executor: logs and returns None instead of raising."""
+        try:
+            return self.scrape_individual_product(product_url, category_id, subcategory_id)
+        except Exception as e:
+            logger.warning(f"Error processing product {product_url}: {e}")
+            return None
+    
+    @contextlib.contextmanager
+    def _worker_pool(self):
+        """Thread pool for page fetches; if the caller fails or is interrupted, queued fetches are cancelled instead of run."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                yield executor
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    
+    def _schedule_products(self, executor, product_links, category_id=None, subcategory_id=None):
+        """Submit a listing's product pages to the executor, skipping URLs already scraped or queued; returns (url, future) pairs."""
+        scheduled = []
+        for product_url in product_links:
+            # Check if we've already processed (or queued) this URL
+            if product_url in self.processed_urls or product_url in self._scheduled_urls:
+                logger.info(f"Skipping already processed URL: {product_url}")
+                continue
+            self._scheduled_urls.add(product_url)
+            future = executor.submit(self._scrape_product_safely, product_url, category_id, subcategory_id)
+            scheduled.append((product_url, future))
+        return scheduled
+    
+    def _collect_products(self, product_links, scheduled):
+        """Wait for a listing's scheduled product pages and return the scraped products in link order."""
+        products = []
+        for i, (product_url, future) in enumerate(scheduled):
+            product_data = future.result()
+            if product_data:
+                products.append(product_data)
+                logger.info(f"Scraped product {i+1}/{len(scheduled)}: {product_data.product_name}")
+            else:
+                logger.warning(f"Failed to scrape product from: {product_url}")
+        
+        skipped_duplicates = len(product_links) - len(scheduled)
+        logger.info(f"Scraped {len(products)} products from {len(product_links)} product links (skipped {skipped_duplicates} duplicates)")
+        return products
+    
     def get_products(self, url, category_id=None, subcategory_id=None):
         """Scrape all products from a specific category page by visiting individual product pages."""
         logger.info(f"Scraping products from category page: {url}")
@@ -549,165 +1088,95 @@ class IGoldScraper:
         if not product_links:
             logger.warning(f"No product links found on {url}")
             return []
-
-        products = []
-        skipped_duplicates = 0
         
-        for i, product_url in enumerate(product_links):
-            try:
-                # Check if we've already processed this URL
-                if product_url in self.processed_urls:
-                    skipped_duplicates += 1
-                    logger.info(f"Skipping already processed URL: {product_url}")
-                    continue
-                
-                product_data = self.scrape_individual_product(product_url, category_id, subcategory_id)
-                if product_data:
-                    products.append(product_data)
-                    logger.info(f"Scraped product {i+1}/{len(product_links)}: {product_data.get('product_name', 'Unknown')}")
-                else:
-                    logger.warning(f"Failed to scrape product from: {product_url}")
-
-                # Throttling between product pages
-                time.sleep(1)
-
-            except Exception as e:
-                logger.warning(f"Error processing product {product_url}: {e}")
-                continue
-
-        logger.info(f"Scraped {len(products)} products from {len(product_links)} product links (skipped {skipped_duplicates} duplicates)")
-        return products
+        # Fetch product pages concurrently; get_page spaces the requests out, so no sleep is needed here
+        with self._worker_pool() as executor:
+            return self._collect_products(product_links, self._schedule_products(executor, product_links, category_id, subcategory_id))
     
     def get_or_create_vendor(self, refinery_name, country=''):
         """Get existing vendor or create new one, return vendor_id."""
         if not refinery_name:
             return None
             
-        # Check if vendor already exists
-        for vendor in self.vendors:
-            if vendor['name'].lower() == refinery_name.lower():
-                logger.info(f"Found existing vendor: {vendor['name']} (ID: {vendor['vendor_id']})")
-                return vendor['vendor_id']
-        
-        # Create new vendor
-        self.vendor_counter += 1
-        new_vendor = {
-            'vendor_id': self.vendor_counter,
-            'name': refinery_name,
-            'country': country
-        }
-        self.vendors.append(new_vendor)
-        return self.vendor_counter
-    
-    def remove_duplicate_products(self):
-        """Remove duplicate products based on slug (URL path) which is the most reliable identifier."""
-        logger.info("Removing duplicate products...")
-        
-        original_count = len(self.products)
-        seen_slugs = set()
-        unique_products = []
-        duplicate_count = 0
-        
-        for product in self.products:
-            # Use slug as the primary unique identifier since it represents the URL path
-            product_slug = product.get('slug', '').strip()
+        with self._lock:
+            # Check if vendor already exists
+            vendor_id = self.vendor_ids.get(refinery_name.lower())
+            if vendor_id is not None:
+                logger.info(f"Found existing vendor: {refinery_name} (ID: {vendor_id})")
+                return vendor_id
             
-            if product_slug and product_slug not in seen_slugs:
-                seen_slugs.add(product_slug)
-                unique_products.append(product)
-            elif product_slug:
-                duplicate_count += 1
-                logger.info(f"Removing duplicate product by slug: {product.get('product_name', 'Unknown')} - {product_slug}")
-            else:
-                # If no slug, fallback to name + weight combination
-                product_key = (
-                    product.get('product_name', '').lower().strip(),
-                    product.get('weight', '').strip()
-                )
-                
-                if product_key not in seen_slugs:
-                    seen_slugs.add(product_key)
-                    unique_products.append(product)
-                else:
-                    duplicate_count += 1
-                    logger.info(f"Removing duplicate product by name+weight: {product.get('product_name', 'Unknown')} - {product.get('weight', 'Unknown')}")
-        
-        self.products = unique_products
-        logger.info(f"Removed {duplicate_count} duplicate products. Original: {original_count}, Unique: {len(self.products)}")
-        
-        # Also clean up images for removed products
-        if duplicate_count > 0:
-            self.cleanup_orphaned_images()
+            # Create new vendor
+            self.vendor_counter += 1
+            vendor = {'vendor_id': self.vendor_counter, 'name': refinery_name, 'country': country}
+            _append_row(self.vendors, **vendor)
+            self._write_jsonl('vendors', vendor)
+            self.vendor_ids[refinery_name.lower()] = self.vendor_counter
+            return self.vendor_counter
     
-    def cleanup_orphaned_images(self):
-        """Remove images that belong to products that were removed as duplicates."""
-        logger.info("Cleaning up orphaned images...")
+    def _add_product(self, product):
+        """Add a scraped product unless it duplicates one already added; assigns its ID and records its images."""
+        # Use slug as the primary unique identifier since it represents the URL path;
+        # if there is no slug, fall back to the name + weight combination
+        # One set probe: add() leaves the size unchanged when the key was already seen
+        product_key = _product_key(product)
+        seen_count = len(self._seen_keys)
+        self._seen_keys.add(product_key)
+        if len(self._seen_keys) == seen_count:
+            if product_key[0] == 'slug':
+                logger.info(f"Skipping duplicate product by slug: {product.product_name} - {product_key[1]}")
+            else:
+                logger.info(f"Skipping duplicate product by name+weight: {product.product_name} - {product.weight}")
+            self.duplicate_count += 1
+            return False
         
-        # Get all valid product IDs
-        valid_product_ids = {product['product_id'] for product in self.products}
+        # Optionally catch spelling/spacing variants of the same product; names are only compared when
+        # weight and every number in them agree, so e.g. the 2020 and 2021 issues of a coin stay separate
+        near_duplicate_group = (product._norm_weight, tuple(_NUMBER_RE.findall(product.product_name)))
+        if self._near_duplicates and self._near_duplicates.add(product.product_name, group=near_duplicate_group):
+            logger.info(f"Skipping near-duplicate product by name: {product.product_name} - {product.weight}")
+            self.duplicate_count += 1
+            return False
         
-        # Filter images to keep only those with valid product IDs
-        original_image_count = len(self.images)
-        self.images = [img for img in self.images if img['product_id'] in valid_product_ids]
+        self.product_counter += 1
+        product.product_id = self.product_counter
+        if product._refinery_name:
+            # Get or create vendor and set vendor_id
+            product.vendor_id = self.get_or_create_vendor(product._refinery_name, product.country)
+        self.products.append(product)
+        self._write_jsonl('products', _public_fields(product))
         
-        removed_images = original_image_count - len(self.images)
-        if removed_images > 0:
-            logger.info(f"Removed {removed_images} orphaned images. Original: {original_image_count}, Remaining: {len(self.images)}")
+        # Store images in images table
+        for image_order, image_url in enumerate(product._image_urls, 1):
+            image = {'product_id': product.product_id, 'image_url': image_url, 'image_order': image_order}
+            _append_row(self.images, **image)
+            self._write_jsonl('images', image)
+            logger.info(f"Added product image {image_order} for product {product.product_id}: {image_url}")
+        return True
     
     def is_valid_product_block(self, block):
         """Check if a block is a valid product block and not some other element."""
         try:
             block_text = block.get_text(strip=True).lower()
             
-            # If it's a kv__member-item, it's likely a product
-            if block.get('class') and 'kv__member-item' in block.get('class'):
-                # Additional validation for kv__member-item
-                has_price = bool(re.search(r'\d+\.?\d*\s*лв', block_text))
-                has_view_more = 'вижте повече' in block_text
-                return has_price and has_view_more
-            
-            # Exclude non-product elements
-            exclude_patterns = [
-                'безплатна доставка',
-                'застраховка на пратка',
-                'консултация',
-                'за контакти',
-                'ако бързате',
-                'общи условия',
-                'политика за поверителност',
-                'разбрах',
-                'igold в медиите',
-                'facebook live',
-                'защо да инвестираме',
-                'защо да купите злато от igold'
-            ]
-            
-            for pattern in exclude_patterns:
-                if pattern in block_text:
-                    return False
-            
-            # Must contain product-related keywords
-            product_keywords = [
-                'златно кюлче', 'златна монета', 'сребърно кюлче', 'сребърна монета',
-                'кюлче платина', 'кюлче паладий', 'valcambi', 'pamp', 'argor-heraeus',
-                'кругерранд', 'британия', 'американски орел', 'канадски кленов лист',
-                'виенска филхармония', 'австралийско кенгуру', 'монета', 'кюлче',
-                'франка', 'лири', 'долар', 'евро', 'рупия', 'реал', 'йена'
-            ]
-            
-            has_product_keyword = any(keyword in block_text for keyword in product_keywords)
-            
-            # Must have price information
-            has_price = bool(re.search(r'\d+\.?\d*\s*лв', block_text))
+            # Every product block has a "Вижте повече" link; this substring test is the cheapest check
+            if 'вижте повече' not in block_text:
+                return False
             
-            # Must have weight or be a recognizable coin
-            has_weight = bool(re.search(r'\d+\.?\d*\s*гр\.', block_text))
-            is_coin = any(coin in block_text for coin in ['монета', 'франка', 'лири', 'долар', 'евро'])
+            # If it's a kv__member-item, it's likely a product; only the price is left to check
+            if 'kv__member-item' in (block.get('class') or ()):
+                return bool(_PRICE_RE.search(block_text))
             
-            # Must have "Вижте повече" link (indicates it's a product)
-            has_view_more = 'вижте повече' in block_text
+            # Exclude non-product elements
+            if _BLOCK_EXCLUDE_RE.search(block_text):
+                return False
             
-            return has_product_keyword and has_price and (has_weight or is_coin) and has_view_more
+            # Must contain product-related keywords and price information,
+            # and have a weight or be a recognizable coin
+            return bool(
+                _BLOCK_PRODUCT_KEYWORD_RE.search(block_text) and
+                _PRICE_RE.search(block_text) and
+                (_WEIGHT_RE.search(block_text) or _BLOCK_COIN_RE.search(block_text))
+            )
             
         except Exception as e:
             logger.warning(f"Error validating product block: {e}")
@@ -724,7 +1193,6 @@ class IGoldScraper:
                 'country': '',
                 'weight': '',
                 'purity': '',
-                'fine_gold': '',
                 'diameter_size': '',
                 'buy_price': '',
                 'sell_price': '',
@@ -732,32 +1200,14 @@ class IGoldScraper:
                 'product_url': ''
             }
             
-            # Get all text from the block, but exclude nested divs with status information
-            # First, remove nested divs that contain status text
-            block_copy = block.__copy__() if hasattr(block, '__copy__') else block
-            
-            # Find and remove nested divs with status information
-            status_divs = block_copy.find_all('div', style=re.compile(r'margin-top.*margin-bottom'))
-            for div in status_divs:
-                div.decompose()  # Remove the div and its contents
-            
-            # Also remove spans with specific styling that contain status text
-            status_spans = block_copy.find_all('span', style=re.compile(r'color.*font-size'))
-            for span in status_spans:
-                span.decompose()  # Remove the span and its contents
-            
-            block_text = block_copy.get_text(strip=True)
+            # Get all text from the block, but exclude nested divs and spans with status information
+            block_text = _block_text(block)
+            block_text_lower = block_text.lower()
             
             # Extract product name - clean version without status text
             # Look for patterns like "X гр. Златно Кюлче" or "Златна Монета"
-            name_patterns = [
-                r'(\d+\.?\d*\s*гр\.\s*[^0-9]+?)(?=\s*\d+\.?\d*\s*лв|\s*Вижте|\s*$)',
-                r'(Златна Монета[^0-9]+?)(?=\s*\d+\.?\d*\s*гр|\s*\d+\.?\d*\s*лв|\s*Вижте|\s*$)',
-                r'(Златно Кюлче[^0-9]+?)(?=\s*\d+\.?\d*\s*гр|\s*\d+\.?\d*\s*лв|\s*Вижте|\s*$)'
-            ]
-            
-            for pattern in name_patterns:
-                match = re.search(pattern, block_text)
+            for pattern in _BLOCK_NAME_RES:
+                match = pattern.search(block_text)
                 if match:
                     product_data['product_name'] = match.group(1).strip()
                     break
@@ -767,66 +1217,41 @@ class IGoldScraper:
                 lines = block_text.split('\n')
                 for line in lines:
                     line = line.strip()
+                    line_lower = line.lower()
                     # Skip lines with prices, status text, or non-product content
                     if (line and 
-                        not re.match(r'^\d+\.?\d*\s*лв', line) and 
-                        'Вижте' not in line and
-                        'Изчерпани' not in line and
-                        'Поръчайте авансово' not in line and
-                        'Налични' not in line and
-                        'ниско качество' not in line and
-                        'с повреди' not in line and
-                        'сив' not in line and
-                        'лунар' not in line and
-                        'прасе' not in line and
-                        'купуваме' not in line.lower() and
-                        'продаваме' not in line.lower() and
-                        'за вас' not in line.lower() and
-                        'контакти' not in line.lower() and
-                        'общи условия' not in line.lower() and
-                        'продаваме злато' not in line.lower() and
-                        'отстъпка' not in line.lower() and
-                        'защо да купите' not in line.lower() and
-                        'конкурентни цени' not in line.lower() and
-                        'добри наличности' not in line.lower() and
-                        'актуализация' not in line.lower() and
-                        'само световно' not in line.lower() and
-                        'достъпна и дискретна' not in line.lower() and
-                        'безплатна доставка' not in line.lower() and
-                        'facebook live' not in line.lower() and
-                        'igold в медиите' not in line.lower()):
+                        not _PRICE_RE.match(line) and 
+                        not _NAME_LINE_STATUS_RE.search(line) and
+                        not _NAME_LINE_EXCLUDE_RE.search(line_lower)):
                         product_data['product_name'] = line
                         break
             
             # Clean up the product name by removing any remaining status text
             if product_data['product_name']:
                 # Remove common status text patterns
-                status_patterns = [
-                    r'Изчерпани\..*',
-                    r'Поръчайте авансово.*',
-                    r'Налични.*',
-                    r'ниско качество.*',
-                    r'с повреди.*',
-                    r'сив.*',
-                    r'лунар.*',
-                    r'прасе.*',
-                    r'\(\s*\+?\d+\s*лв\.?\s*\)',
-                    r'\(\s*-?\d+\s*лв\.?\s*\)'
-                ]
-                
-                for pattern in status_patterns:
-                    product_data['product_name'] = re.sub(pattern, '', product_data['product_name']).strip()
+                for pattern in _BLOCK_STATUS_RES:
+                    product_data['product_name'] = pattern.sub('', product_data['product_name']).strip()
                 
                 # Remove extra whitespace
                 product_data['product_name'] = ' '.join(product_data['product_name'].split())
             
-            # Extract weight
-            weight_match = re.search(r'(\d+\.?\d*)\s*гр\.', block_text)
-            if weight_match:
-                product_data['weight'] = weight_match.group(1) + ' гр.'
+            # Extract prices, weight, purity and country in a single scan
+            price_matches = []
+            purity = ''
+            for match in _BLOCK_TOKEN_RE.finditer(block_text):
+                kind = match.lastgroup
+                if kind == 'price':
+                    price_matches.append(match.group('price'))
+                elif kind == 'weight':
+                    if not product_data['weight']:
+                        product_data['weight'] = match.group('weight') + ' гр.'
+                elif kind == 'purity':
+                    purity = purity or match.group('purity')
+                else:
+                    # Valcambi, Argor-Heraeus and Pamp are all Swiss refineries
+                    product_data['country'] = 'Швейцария'
             
-            # Extract prices (buy and sell) - only numeric values, no "лв."
-            price_matches = re.findall(r'(\d+\.?\d*)\s*лв', block_text)
+            # Prices (buy and sell) - only numeric values, no "лв."
             if len(price_matches) >= 2:
                 # Usually the first price is buy price, second is sell price
                 product_data['buy_price'] = price_matches[0]
@@ -834,38 +1259,21 @@ class IGoldScraper:
             elif len(price_matches) == 1:
                 product_data['buy_price'] = price_matches[0]
             
-            # Extract country information
-            if 'Valcambi' in block_text:
-                product_data['country'] = 'Швейцария'
-            elif 'Argor-Heraeus' in block_text or 'Argor Heraeus' in block_text:
-                product_data['country'] = 'Швейцария'
-            elif 'Pamp' in block_text:
-                product_data['country'] = 'Швейцария'
-            
-            # Extract purity (usually 999.9 or similar for gold)
-            purity_match = re.search(r'(\d{3,4}\.?\d*)\s*(?:проба|purity)', block_text, re.IGNORECASE)
-            if purity_match:
-                product_data['purity'] = purity_match.group(1)
-            elif 'злато' in block_text.lower() or 'gold' in block_text.lower():
+            # Purity (usually 999.9 or similar for gold)
+            if purity:
+                product_data['purity'] = purity
+            elif 'злато' in block_text_lower or 'gold' in block_text_lower:
                 product_data['purity'] = '999.9'  # Standard for investment gold
             
-            # Extract fine gold content
-            if product_data['weight'] and product_data['purity']:
-                try:
-                    weight_num = float(re.search(r'(\d+\.?\d*)', product_data['weight']).group(1))
-                    purity_num = float(product_data['purity'])
-                    fine_gold = weight_num * (purity_num / 1000)
-                    product_data['fine_gold'] = f"{fine_gold:.2f} гр."
-                except:
-                    pass
+            # Fine gold content is computed for all products at once in save_to_excel
             
             # Look for image URLs (separate into two columns)
             images = block.find_all('img')
             image_urls = []
             for img in images:
                 img_src = img.get('src', '')
-                if img_src and not img_src.startswith('http'):
-                    img_src = urljoin(self.base_url, img_src)
+                if img_src:
+                    img_src = self._absolutize(img_src)
                 if img_src:
                     image_urls.append(img_src)
             
@@ -876,11 +1284,11 @@ class IGoldScraper:
                 product_data['image_url_2'] = image_urls[1]
             
             # Look for "Вижте повече" link
-            view_more_link = block.find('a', string=re.compile(r'Вижте повече'))
+            view_more_link = block.find('a', string=_VIEW_MORE_RE)
             if view_more_link:
                 href = view_more_link.get('href', '')
-                if href and not href.startswith('http'):
-                    href = urljoin(self.base_url, href)
+                if href:
+                    href = self._absolutize(href)
                 product_data['product_url'] = href
             
             # Only return if we have meaningful product data
@@ -903,7 +1311,7 @@ class IGoldScraper:
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=_PRODUCT_DETAILS_FILTER)
             product_data = {
                 'product_name': '',
                 'image_url': '',
@@ -927,8 +1335,8 @@ class IGoldScraper:
             img = soup.find('img')
             if img:
                 img_src = img.get('src', '')
-                if img_src and not img_src.startswith('http'):
-                    img_src = urljoin(self.base_url, img_src)
+                if img_src:
+                    img_src = self._absolutize(img_src)
                 product_data['image_url'] = img_src
             
             # Look for product details in various formats
@@ -976,18 +1384,19 @@ class IGoldScraper:
                             else:
                                 product_data['other_properties'] = f"{key}: {value}"
             
-            # Try to find prices in different formats
-            price_elements = soup.find_all(text=re.compile(r'[\d,]+\.?\d*\s*лв'))
-            for price_text in price_elements:
-                price_text = price_text.strip()
-                # Try to determine if it's buy or sell price based on context
-                parent = price_text.parent if hasattr(price_text, 'parent') else None
-                if parent:
-                    parent_text = parent.get_text(strip=True).lower()
-                    if 'продаваме' in parent_text or 'buy' in parent_text:
-                        product_data['buy_price'] = price_text
-                    elif 'купуваме' in parent_text or 'sell' in parent_text:
-                        product_data['sell_price'] = price_text
+            # Try to find prices in different formats, in one scan over the text of the whole page;
+            # price labels can sit anywhere, not only in the elements the details filter keeps
+            page_text = _page_text(response.content)
+            context_start = 0
+            for price_match in _DETAILS_PRICE_RE.finditer(page_text):
+                price_text = price_match.group(0).strip()
+                # Try to determine if it's buy or sell price based on the label text since the previous price
+                context = page_text[context_start:price_match.start()].lower()
+                context_start = price_match.end()
+                if 'продаваме' in context or 'buy' in context:
+                    product_data['buy_price'] = price_text
+                elif 'купуваме' in context or 'sell' in context:
+                    product_data['sell_price'] = price_text
             
             return product_data
             
@@ -1000,38 +1409,45 @@ class IGoldScraper:
         logger.info(f"Saving data to {filename}...")
         
         try:
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+            # Rows are streamed straight from the scraped records; constant_memory flushes each row to disk
+            with xlsxwriter.Workbook(filename, {
+                'constant_memory': True,
+                'strings_to_numbers': False,
+                'strings_to_formulas': False,
+                'strings_to_urls': False
+            }) as workbook:
                 # Categories sheet
                 if self.categories:
-                    df_categories = pd.DataFrame(self.categories)
-                    df_categories.to_excel(writer, sheet_name='Categories', index=False)
+                    columns = list(dict.fromkeys(key for category in self.categories for key in category))
+                    _write_sheet(workbook, 'Categories', columns,
+                                 ([category.get(key) for key in columns] for category in self.categories))
                     logger.info(f"Saved {len(self.categories)} categories")
                 
                 # Subcategories sheet
                 if self.subcategories:
-                    df_subcategories = pd.DataFrame(self.subcategories)
-                    df_subcategories.to_excel(writer, sheet_name='Subcategories', index=False)
+                    columns = list(dict.fromkeys(key for subcategory in self.subcategories for key in subcategory))
+                    _write_sheet(workbook, 'Subcategories', columns,
+                                 ([subcategory.get(key) for key in columns] for subcategory in self.subcategories))
                     logger.info(f"Saved {len(self.subcategories)} subcategories")
                 
                 # Products sheet
                 if self.products:
-                    df_products = pd.DataFrame(self.products)
-                    df_products.to_excel(writer, sheet_name='Products', index=False)
+                    fine_gold = _fine_gold_column(self.products)
+                    _write_sheet(workbook, 'Products', PRODUCT_SHEET_COLUMNS, (
+                        [product_fine_gold if key == 'fine_gold' else getattr(product, key) for key in PRODUCT_SHEET_COLUMNS]
+                        for product, product_fine_gold in zip(self.products, fine_gold)
+                    ))
                     logger.info(f"Saved {len(self.products)} products")
                 
                 # Images sheet
-                if self.images:
-                    df_images = pd.DataFrame(self.images)
-                    df_images.to_excel(writer, sheet_name='Images', index=False)
-                    logger.info(f"Saved {len(self.images)} images")
+                if _row_count(self.images):
+                    _write_sheet(workbook, 'Images', list(self.images), zip(*self.images.values()))
+                    logger.info(f"Saved {_row_count(self.images)} images")
                 
                 # Vendors sheet
-                if self.vendors:
-                    df_vendors = pd.DataFrame(self.vendors)
-                    df_vendors.to_excel(writer, sheet_name='Vendors', index=False)
-                    logger.info(f"Saved {len(self.vendors)} vendors")
-                
-                
+                if _row_count(self.vendors):
+                    _write_sheet(workbook, 'Vendors', list(self.vendors), zip(*self.vendors.values()))
+                    logger.info(f"Saved {_row_count(self.vendors)} vendors")
             
             logger.info(f"Data successfully saved to {filename}")
             return True
@@ -1059,56 +1475,59 @@ class IGoldScraper:
                 categories = [cat for cat in categories if str(cat['id']) == str(test_category_id)]
                 logger.info(f"Test mode: Filtered to {len(categories)} categories")
             
-            # Step 2: Get subcategories for each category
-            for category in categories:
-                category_id = category['id']
-                subcategories = self.get_subcategories(category_id)
-                self.subcategories.extend(subcategories)
-                
-                # Throttling between categories
-                time.sleep(2)
-            
-            # Step 3: Get products from each category page
-            for category in categories:
-                category_id = category['id']
-                category_url = category['url']
-                category_name = category['name']
+            # Steps 2 and 3 share one pool and run as a pipeline: every page is requested as soon as
+            # its URL is known, and get_page spaces the requests out. Tasks never wait on other tasks;
+            # only this thread waits, in category/listing order, so the output order is fixed.
+            with self._worker_pool() as executor:
+                # Step 2: Get subcategories for each category
+                subcategory_futures = [executor.submit(self.get_subcategories, category['id']) for category in categories]
                 
-                logger.info(f"DEBUG: category_id = {category_id}, type = {type(category_id)}")
-                if category_id == 1 or category_id == '1':  # Gold category - scrape by subcategories
-                    logger.info(f"Scraping products for category {category_id}: {category_name} (by subcategories)")
+                # Step 3: Get product links from each category page (or gold subcategory page)
+                listings = []
+                for category, subcategory_future in zip(categories, subcategory_futures):
+                    category_id = category['id']
+                    category_url = category['url']
+                    category_name = category['name']
                     
-                    # Get subcategories for gold
-                    gold_subcategories = [sub for sub in self.subcategories if sub['parent_category_id'] == 1 or sub['parent_category_id'] == '1']
-                    
-                    for subcategory in gold_subcategories:
-                        subcategory_id = subcategory['id']
-                        subcategory_url = subcategory['url']
-                        subcategory_name = subcategory['name']
-                        
-                        logger.info(f"Scraping subcategory {subcategory_id}: {subcategory_name}")
-                        products = self.get_products(subcategory_url, category_id, subcategory_id)
-                        self.products.extend(products)
+                    logger.info(f"DEBUG: category_id = {category_id}, type = {type(category_id)}")
+                    if category_id == 1 or category_id == '1':  # Gold category - scrape by subcategories
+                        logger.info(f"Scraping products for category {category_id}: {category_name} (by subcategories)")
                         
-                        logger.info(f"Found {len(products)} products in subcategory {subcategory_name}")
+                        # Get subcategories for gold
+                        self.subcategories.extend(subcategory_future.result())
+                        gold_subcategories = [sub for sub in self.subcategories if sub['parent_category_id'] == 1 or sub['parent_category_id'] == '1']
                         
-                        # Throttling between subcategories
-                        time.sleep(2)
-                else:
-                    # For other categories, scrape from main category page
-                    logger.info(f"Scraping products for category {category_id}: {category_name}")
-                    products = self.get_products(category_url, category_id)
-                    self.products.extend(products)
-                    
-                    logger.info(f"Found {len(products)} products in {category_name} category")
+                        for subcategory in gold_subcategories:
+                            logger.info(f"Scraping subcategory {subcategory['id']}: {subcategory['name']}")
+                            links_future = executor.submit(self.get_product_links, subcategory['url'], category_id)
+                            listings.append((subcategory['url'], category_id, subcategory['id'], f"subcategory {subcategory['name']}", links_future))
+                    else:
+                        # For other categories, scrape from main category page
+                        logger.info(f"Scraping products for category {category_id}: {category_name}")
+                        links_future = executor.submit(self.get_product_links, category_url, category_id)
+                        listings.append((category_url, category_id, None, f"{category_name} category", links_future))
+                        self.subcategories.extend(subcategory_future.result())
                 
-                # Throttling between categories
-                time.sleep(2)
-            
-            # Step 4: Remove duplicate products
-            self.remove_duplicate_products()
+                # Queue each listing's product pages as soon as its links are in; every subcategory
+                # page has been parsed by now, so listing_urls is complete before any product is fetched
+                scheduled_listings = []
+                for url, category_id, subcategory_id, label, links_future in listings:
+                    logger.info(f"Scraping products from category page: {url}")
+                    product_links = links_future.result()
+                    if not product_links:
+                        logger.warning(f"No product links found on {url}")
+                    scheduled = self._schedule_products(executor, product_links, category_id, subcategory_id)
+                    scheduled_listings.append((label, product_links, scheduled))
+                
+                for label, product_links, scheduled in scheduled_listings:
+                    products = self._collect_products(product_links, scheduled) if product_links else []
+                    # Added here, in listing order, so product IDs do not depend on thread timing
+                    for product in products:
+                        self._add_product(product)
+                    logger.info(f"Found {len(products)} products in {label}")
+            logger.info(f"Skipped {self.duplicate_count} duplicate products")
             
-            # Step 5: Save to Excel
+            # Step 4: Save to Excel
             filename = 'igold_data_test.xlsx' if test_mode else 'igold_data.xlsx'
             success = self.save_to_excel(filename)
             
@@ -1120,8 +1539,8 @@ class IGoldScraper:
                 logger.info(f"Total categories: {len(self.categories)}")
                 logger.info(f"Total subcategories: {len(self.subcategories)}")
                 logger.info(f"Total products: {len(self.products)}")
-                logger.info(f"Total images: {len(self.images)}")
-                logger.info(f"Total vendors: {len(self.vendors)}")
+                logger.info(f"Total images: {_row_count(self.images)}")
+                logger.info(f"Total vendors: {_row_count(self.vendors)}")
                 return True
             else:
                 logger.error("Failed to save data to Excel")
@@ -1130,6 +1549,8 @@ class IGoldScraper:
         except Exception as e:
             logger.error(f"Error during scraping: {e}")
             return False
+        finally:
+            self.close_jsonl()
 
 def main():
     """Main function to run the scraper."""
@@ -1139,23 +1560,37 @@ def main():
     test_mode = len(sys.argv) > 1 and sys.argv[1] == '--test'
     test_category_id = '2'  # Silver category ID
     
-    scraper = IGoldScraper()
+    # Optionally stream scraped rows to JSONL files as well: --jsonl [DIR]
+    jsonl_dir = None
+    if '--jsonl' in sys.argv:
+        index = sys.argv.index('--jsonl')
+        next_arg = sys.argv[index + 1] if index + 1 < len(sys.argv) else ''
+        jsonl_dir = next_arg if next_arg and not next_arg.startswith('--') else 'igold_jsonl'
     
-    if test_mode:
-        print("🧪 Running in TEST MODE - Silver only")
-        success = scraper.run(test_mode=True, test_category_id=test_category_id)
-        if success:
-            print("\n✅ TEST MODE scraping completed successfully!")
-            print("📊 Data saved to igold_data_test.xlsx")
-        else:
-            print("\n❌ TEST MODE scraping failed. Check the logs for details.")
-    else:
-        success = scraper.run()
-        if success:
-            print("\n✅ Scraping completed successfully!")
-            print("📊 Data saved to igold_data.xlsx")
+    # Optionally drop near-duplicate product names as well: --near-duplicates
+    near_duplicate_threshold = 0.85 if '--near-duplicates' in sys.argv else None
+    
+    # Optionally cache fetched pages on disk for an hour, for quick re-runs while developing: --cache
+    cache_name = 'igold_cache' if '--cache' in sys.argv else None
+    
+    # The with block closes the JSONL files however the run ends
+    with IGoldScraper(jsonl_dir=jsonl_dir, near_duplicate_threshold=near_duplicate_threshold,
+                      cache_name=cache_name) as scraper:
+        if test_mode:
+            print("🧪 Running in TEST MODE - Silver only")
+            success = scraper.run(test_mode=True, test_category_id=test_category_id)
+            if success:
+                print("\n✅ TEST MODE scraping completed successfully!")
+                print("📊 Data saved to igold_data_test.xlsx")
+            else:
+                print("\n❌ TEST MODE scraping failed. Check the logs for details.")
         else:
-            print("\n❌ Scraping failed. Check the logs for details.")
+            success = scraper.run()
+            if success:
+                print("\n✅ Scraping completed successfully!")
+                print("📊 Data saved to igold_data.xlsx")
+            else:
+                print("\n❌ Scraping failed. Check the logs for details.")
 
 if __name__ == "__main__":
     main()
@@ -6,47 +6,310 @@ Downloads all images from the Images table in igold_data.xlsx
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import sys
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import atexit
 from urllib.parse import urlparse
 from pathlib import Path
 import time
+import asyncio
+import contextlib
+import sqlite3
+import hashlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import socket
+import mmap
+import itertools
+
+try:
+    import aiohttp  # Optional, concurrent downloads; without it images are fetched one at a time
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx  # Optional, HTTP/2 client multiplexing image fetches over one connection per host
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+except ImportError:
+    httpx = None
+
+# Errors that mean an async download failed, for whichever clients are installed
+ASYNC_ERRORS = (asyncio.TimeoutError,)
+if aiohttp is not None:
+    ASYNC_ERRORS += (aiohttp.ClientError,)
+if httpx is not None:
+    ASYNC_ERRORS += (httpx.HTTPError,)
+
+try:
+    import python_calamine  # noqa: F401  Optional, Rust XLSX reader for pd.read_excel(engine='calamine')
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+try:
+    from tqdm import tqdm  # Optional, progress bar when run from a terminal
+except ImportError:
+    tqdm = None
+
+try:
+    import imagehash  # Optional, perceptual-hash matching of near-identical images
+    from PIL import Image
+except ImportError:
+    imagehash = None
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('image_downloader.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+
+def _configure_logging():
+    """
+    Log to image_downloader.log and the console; records are formatted by the caller and
+    written by a background thread, so downloads never wait on the log file or the console
+    
+    Called from main() rather than at import, so hash worker processes that import this
+    module don't start a listener thread or open the log file.
+    """
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, logging.FileHandler('image_downloader.log'), logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[QueueHandler(log_queue)]
+    )
+    # httpx/httpcore log every request at INFO; keep that out of the download log
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    logging.getLogger('httpcore').setLevel(logging.WARNING)
+
+
+def _perceptual_hash(filepath):
+    """
+    Average hash of an image, or None if the file is not an image Pillow can read
+    
+    Module-level so it can run in a ProcessPoolExecutor worker.
+    
+    Args:
+        filepath (Path): Local path of the image
+        
+    Returns:
+        str: Hex-encoded 64-bit average hash
+    """
+    try:
+        with Image.open(filepath) as image:
+            return str(imagehash.average_hash(image))
+    except Exception:
+        return None
+
+
+@contextlib.contextmanager
+def _dns_cache(maxsize=64):
+    """
+    Memoize socket.getaddrinfo while the block runs, so reconnecting to a host skips the resolver
+    """
+    original = socket.getaddrinfo
+    cached = functools.lru_cache(maxsize=maxsize)(original)
+
+    def getaddrinfo(*args, **kwargs):
+        try:
+            return list(cached(*args, **kwargs))
+        except TypeError:  # Unhashable arguments
+            return original(*args, **kwargs)
+
+    socket.getaddrinfo = getaddrinfo
+    try:
+        yield
+    finally:
+        socket.getaddrinfo = original
+
+
+class _PartFile:
+    """
+    A downloaded image being written to its own '<filepath>.<id>.part' file in batches,
+    moved into place once complete
+    
+    Large bodies are written with O_DIRECT where the OS supports it, from page-aligned
+    buffers, so they go straight to disk instead of through the page cache.
+    """
+    BLOCK_SIZE = 4096
+    DIRECT_IO_MIN_SIZE = 256 * 1024
+    # Unique per process, so concurrent downloads of the same filename never share a partial file
+    _ids = itertools.count()
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.partpath = filepath.with_name(f"{filepath.name}.{os.getpid()}-{next(self._ids)}.part")
+        self._file = None
+        self._direct = False
+        # With O_DIRECT, bytes short of a whole block are held back for the next batch
+        self._tail = b''
+
+    def _open(self, size):
+        """
+        Create the partial file, with O_DIRECT if the first batch is large enough
+        
+        Args:
+            size (int): Size of the first batch
+            
+        Returns:
+            io.FileIO: Unbuffered file
+        """
+        if size >= self.DIRECT_IO_MIN_SIZE and hasattr(os, 'O_DIRECT'):
+            try:
+                fd = os.open(self.partpath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+            except OSError:
+                pass  # Filesystem without O_DIRECT support (e.g. tmpfs)
+            else:
+                self._direct = True
+                return open(fd, 'wb', buffering=0)
+        return open(self.partpath, 'wb', buffering=0)
+
+    def _write_all(self, data):
+        """
+        Write a buffer, retrying short writes
+        
+        Args:
+            data (bytes | mmap.mmap): Data to write
+        """
+        with memoryview(data) as view:
+            offset = 0
+            while offset < len(view):
+                offset += self._file.write(view[offset:])
+
+    def _write_aligned(self, data):
+        """
+        Write whole blocks through a page-aligned buffer, as O_DIRECT requires
+        
+        Args:
+            data (bytes): Data to write, a multiple of BLOCK_SIZE long
+        """
+        with mmap.mmap(-1, len(data)) as buffer:
+            buffer.write(data)
+            self._write_all(buffer)
+
+    def write(self, chunks):
+        """
+        Write a batch of body chunks
+        
+        Args:
+            chunks (list): Body chunks, in order
+        """
+        data = b''.join(chunks)
+        if self._file is None:
+            self._file = self._open(len(data))
+        if not self._direct:
+            self._write_all(data)
+            return
+        data = self._tail + data
+        aligned = len(data) - len(data) % self.BLOCK_SIZE
+        self._tail = data[aligned:]
+        if aligned:
+            self._write_aligned(data[:aligned])
+
+    def finish(self, chunks):
+        """
+        Write the last chunks, close the file and move it over the image
+        
+        Args:
+            chunks (list): Remaining body chunks
+        """
+        self.write(chunks)
+        if self._tail:
+            # Pad the final partial block, then cut the file back to its real size
+            size = self._file.tell() + len(self._tail)
+            self._write_aligned(self._tail.ljust(self.BLOCK_SIZE, b'\0'))
+            self._file.truncate(size)
+            self._tail = b''
+        self._file.close()
+        os.replace(self.partpath, self.filepath)
+
+    def discard(self):
+        """
+        Close and delete the partial file after a failed download
+        """
+        if self._file is not None:
+            self._file.close()
+        with contextlib.suppress(OSError):
+            os.remove(self.partpath)
+
+
 class ImageDownloader:
-    def __init__(self, excel_file='igold_data.xlsx', download_folder='downloaded_images'):
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    # Images are already compressed, so ask for them as-is rather than gzip-wrapped
+    HEADERS = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'identity'}
+    CHUNK_SIZE = 64 * 1024
+    # Bodies are written in batches of up to this size (from a worker thread on the async path)
+    WRITE_BUFFER_SIZE = 1024 * 1024
+    # Async path: batches waiting for a writer, and the number of writer tasks
+    WRITE_QUEUE_SIZE = 32
+    WRITERS = 4
+
+    def __init__(self, excel_file='igold_data.xlsx', download_folder='downloaded_images',
+                 max_connections=64, max_connections_per_host=8, max_in_flight=16, max_retries=3,
+                 perceptual_dedupe=False, http2=False):
         """
         Initialize the image downloader
         
         Args:
             excel_file (str): Path to the Excel file containing image URLs
             download_folder (str): Folder to save downloaded images
+            max_connections (int): Concurrent downloads in total (aiohttp only)
+            max_connections_per_host (int): Concurrent downloads per host (aiohttp), pooled connections per host (requests)
+            max_in_flight (int): Requests in flight at once, kept low to avoid rate limiting (aiohttp only)
+            max_retries (int): Attempts per image on HTTP 429 and 5xx responses
+            perceptual_dedupe (bool): Also link images with the same average hash (requires imagehash)
+            http2 (bool): Download with httpx over HTTP/2 instead of aiohttp (requires httpx[http2])
         """
         self.excel_file = excel_file
         self.download_folder = download_folder
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        if perceptual_dedupe and imagehash is None:
+            logger.warning("imagehash is not installed; only byte-identical images will be deduplicated")
+        self.perceptual_dedupe = perceptual_dedupe and imagehash is not None
+        if http2 and httpx is None:
+            logger.warning("httpx[http2] is not installed; downloading over HTTP/1.1")
+        self.http2 = http2 and httpx is not None
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session.headers.update(self.HEADERS)
+        # Keep-alive connection pool, with the same 429/5xx retry policy as the aiohttp path
+        retry = Retry(total=max_retries - 1, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=['GET'], respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max_connections_per_host, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         # Create download folder if it doesn't exist
-        Path(self.download_folder).mkdir(parents=True, exist_ok=True)
+        self._folder = Path(self.download_folder)
+        self._folder.mkdir(parents=True, exist_ok=True)
+        
+        # URLs and content hashes from earlier runs, persisted next to the images
+        self.cache_file = self._folder / '.download_cache.sqlite'
+        self._cached_urls, self._hash_index = self._load_cache()
+        self._new_urls = []
+        self._new_hashes = []
+        self._existing_files = set()
+        # Process pool for perceptual hashing, set by _hash_process_pool during an async run,
+        # and the semaphore capping images queued on it, created by _download_all_async in its loop
+        self._hash_workers = os.cpu_count() or 1
+        self._hash_pool = None
+        self._hash_slots = None
         
         # Statistics
         self.total_images = 0
         self.downloaded_count = 0
         self.failed_count = 0
         self.skipped_count = 0
+        self.duplicate_count = 0
+        self.completed_count = 0
+        self._progress_bar = None
+        self._write_queue = None
 
     def get_image_filename(self, url):
         """
@@ -63,13 +326,231 @@ class ImageDownloader:
         
         # If no filename in path, generate one from URL
         if not filename or '.' not in filename:
-            # Use a hash of the URL as filename
-            import hashlib
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-            filename = f"image_{url_hash}.jpg"
+            filename = self._fallback_filename(url)
+        
+        return filename
+
+    @staticmethod
+    def _fallback_filename(url):
+        """
+        Filename for a URL whose path has no usable file name, from a hash of the URL
+        
+        Args:
+            url (str): Image URL
+            
+        Returns:
+            str: Generated filename
+        """
+        url_hash = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
+        return f"image_{url_hash}.jpg"
+
+    @staticmethod
+    def _distinct_filename(filename, url, taken):
+        """
+        Filename for a URL whose usual filename is already used by another URL,
+        with a hash of the URL added before the extension
+        
+        Args:
+            filename (str): Filename already taken
+            url (str): Image URL
+            taken (set): Filenames already in use
+            
+        Returns:
+            str: Filename not in taken
+        """
+        stem, extension = os.path.splitext(filename)
+        url_hash = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
+        candidate = f"{stem}_{url_hash}{extension}"
+        for number in itertools.count(2):
+            if candidate not in taken:
+                return candidate
+            candidate = f"{stem}_{url_hash}_{number}{extension}"
+
+    def _filename_function(self, urls):
+        """
+        Build get_image_filename specialized to the common prefix of the URLs
+        
+        When the image URLs share a scheme, host and path start (a single CDN), the file name
+        is just the text after the last '/', found with str.rpartition instead of urlparse.
+        URLs outside that shape fall back to get_image_filename.
+        
+        Args:
+            urls (list): Image URLs (the first 100 are sampled)
+            
+        Returns:
+            Callable[[str], str]: Function mapping a URL to its filename
+        """
+        generic = self.get_image_filename
+        prefix = os.path.commonprefix(urls[:100])
+        scheme_end = prefix.find('://')
+        if scheme_end < 0 or prefix.find('/', scheme_end + 3) < 0 or any(c in prefix for c in '?#;'):
+            return generic
+        
+        def filename(url):
+            if url.startswith(prefix) and '?' not in url and '#' not in url and ';' not in url:
+                name = url.rpartition('/')[2]
+                if '.' in name:
+                    return name
+            return generic(url)
         
         return filename
 
+    def image_filenames(self, urls):
+        """
+        Filenames for a column of URLs, as get_image_filename would give
+        
+        Args:
+            urls (pd.Series): Image URLs
+            
+        Returns:
+            list: Filename for each URL, in order
+        """
+        urls = urls.fillna('').astype(str).tolist()
+        filename = self._filename_function(urls)
+        return [filename(url) for url in urls]
+
+    def _load_cache(self):
+        """
+        Load the URLs downloaded and the content hashes seen by previous runs
+        
+        Returns:
+            tuple: (set of image URLs, dict of content hash -> canonical filename)
+        """
+        with contextlib.closing(sqlite3.connect(self.cache_file)) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS downloaded_urls (url TEXT PRIMARY KEY, filename TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS image_hashes (hash TEXT PRIMARY KEY, filename TEXT NOT NULL)")
+            urls = {url for (url,) in conn.execute("SELECT url FROM downloaded_urls")}
+            hashes = dict(conn.execute("SELECT hash, filename FROM image_hashes"))
+        return urls, hashes
+
+    def _save_cache(self):
+        """
+        Persist the URLs downloaded and the content hashes seen during this run
+        """
+        if not self._new_urls and not self._new_hashes:
+            return
+        with contextlib.closing(sqlite3.connect(self.cache_file)) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO downloaded_urls (url, filename) VALUES (?, ?)", self._new_urls)
+            conn.executemany("INSERT OR REPLACE INTO image_hashes (hash, filename) VALUES (?, ?)", self._new_hashes)
+        self._new_urls = []
+        self._new_hashes = []
+
+    def _scan_download_folder(self):
+        """
+        List the images already in the download folder with one directory scan
+        
+        Returns:
+            set: Names of existing files (symlinks count only if their target exists)
+        """
+        with os.scandir(self._folder) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+
+    def _already_downloaded(self, url, filename):
+        """
+        Check whether an earlier run already saved this URL and the file is still there
+        
+        Args:
+            url (str): Image URL
+            filename (str): Local filename of the image
+            
+        Returns:
+            bool: True if the download can be skipped
+        """
+        return url in self._cached_urls and filename in self._existing_files
+
+    def _record_download(self, url, filename):
+        """
+        Remember a finished download so later runs can skip it
+        
+        Args:
+            url (str): Image URL
+            filename (str): Local filename of the image
+        """
+        self._cached_urls.add(url)
+        self._new_urls.append((url, filename))
+
+    @staticmethod
+    def _content_keys(digest, ahash=None):
+        """
+        Hash keys identifying a downloaded image's content
+        
+        Args:
+            digest (str): BLAKE2b hex digest of the image bytes
+            ahash (str): Average hash of the image, if computed
+            
+        Returns:
+            list: Hash keys, exact match first
+        """
+        keys = [f"blake2b:{digest}"]
+        if ahash is not None:
+            keys.append(f"ahash:{ahash}")
+        return keys
+
+    @contextlib.contextmanager
+    def _hash_process_pool(self):
+        """
+        Run perceptual hashing in worker processes while the block runs (only with perceptual_dedupe)
+        """
+        if not self.perceptual_dedupe:
+            yield
+            return
+        with ProcessPoolExecutor(max_workers=self._hash_workers) as pool:
+            self._hash_pool = pool
+            try:
+                yield
+            finally:
+                self._hash_pool = None
+
+    async def _perceptual_hash_async(self, filepath):
+        """
+        Average-hash an image in the process pool, so decoding doesn't hold the GIL the event loop needs
+        
+        Args:
+            filepath (Path): Local path of the image
+            
+        Returns:
+            str: Hex-encoded 64-bit average hash, or None
+        """
+        async with self._hash_slots:
+            return await asyncio.get_running_loop().run_in_executor(self._hash_pool, _perceptual_hash, filepath)
+
+    def _link_duplicate(self, filename, keys):
+        """
+        Replace a downloaded image with a link when the same content was saved under another name
+        
+        Args:
+            filename (str): Local filename of the image
+            keys (list): Hash keys of the image content
+            
+        Returns:
+            bool: True if the image was replaced by a link
+        """
+        for key in keys:
+            canonical = self._hash_index.get(key)
+            if (canonical is not None and canonical != filename
+                    and (self._folder / canonical).is_file()):
+                break
+        else:
+            for key in keys:
+                self._hash_index[key] = filename
+                self._new_hashes.append((key, filename))
+            return False
+        
+        filepath = self._folder / filename
+        linkpath = filepath.with_name(filename + '.link')
+        try:
+            os.symlink(canonical, linkpath)
+        except OSError:
+            # No symlink support (e.g. Windows without privileges): try a hard link, else keep the copy
+            try:
+                os.link(self._folder / canonical, linkpath)
+            except OSError:
+                return False
+        os.replace(linkpath, filepath)
+        logger.debug(f"Duplicate: {filename} matches {canonical}, linked")
+        self.duplicate_count += 1
+        return True
+
     def download_image(self, url, filename):
         """
         Download a single image
@@ -82,23 +563,22 @@ class ImageDownloader:
             bool: True if successful, False otherwise
         """
         try:
-            filepath = os.path.join(self.download_folder, filename)
+            filepath = self._folder / filename
             
-            # Always download, even if file exists (overwrite)
-            # if os.path.exists(filepath):
-            #     logger.info(f"Skipping {filename} - already exists")
-            #     self.skipped_count += 1
-            #     return True
-            
-            # Download the image
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+            if self._already_downloaded(url, filename):
+                logger.debug(f"Skipping {filename} - already exists")
+                self.skipped_count += 1
+                return True
             
-            # Save the image
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            # Download the image, streaming it to disk
+            with self.session.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                digest = self._save_response(response, filepath)
             
-            logger.info(f"Downloaded: {filename}")
+            ahash = _perceptual_hash(filepath) if self.perceptual_dedupe else None
+            self._link_duplicate(filename, self._content_keys(digest, ahash))
+            self._record_download(url, filename)
+            logger.debug(f"Downloaded: {filename}")
             self.downloaded_count += 1
             return True
             
@@ -111,25 +591,273 @@ class ImageDownloader:
             self.failed_count += 1
             return False
 
+    def _save_response(self, response, filepath):
+        """
+        Stream a response body to disk in fixed-size chunks
+        
+        The body goes to a '.part' file that replaces the image only once complete,
+        so a failed download never leaves a truncated image behind.
+        
+        Args:
+            response (requests.Response): Response opened with stream=True
+            filepath (Path): Local path of the image
+            
+        Returns:
+            str: BLAKE2b hex digest of the body
+        """
+        part = _PartFile(filepath)
+        hasher = hashlib.blake2b()
+        pending = []
+        pending_size = 0
+        try:
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                hasher.update(chunk)
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= self.WRITE_BUFFER_SIZE:
+                    part.write(pending)
+                    pending = []
+                    pending_size = 0
+            part.finish(pending)
+        except BaseException:
+            part.discard()
+            raise
+        return hasher.hexdigest()
+
+    async def _queue_write(self, write, chunks):
+        """
+        Hand a batch to the writer tasks, waiting while the write queue is full
+        
+        Args:
+            write (Callable): _PartFile.write or _PartFile.finish
+            chunks (list): Body chunks to write
+            
+        Returns:
+            asyncio.Future: Resolved once the batch is on disk
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((future, write, chunks))
+        return future
+
+    async def _write_worker(self):
+        """
+        Take batches off the write queue and write them from a worker thread
+        """
+        while True:
+            future, write, chunks = await self._write_queue.get()
+            try:
+                await asyncio.to_thread(write, chunks)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(None)
+            finally:
+                self._write_queue.task_done()
+
+    async def _save_response_async(self, response, filepath):
+        """
+        Stream an async response body to disk
+        
+        Chunks are buffered into batches that writer tasks put on disk while the next
+        batch downloads. Each image has at most one batch queued, which keeps its writes
+        in order and, with the bounded queue, caps the memory held in body buffers.
+        
+        Args:
+            response (aiohttp.ClientResponse | httpx.Response): Response being read
+            filepath (Path): Local path of the image
+            
+        Returns:
+            str: BLAKE2b hex digest of the body
+        """
+        part = _PartFile(filepath)
+        hasher = hashlib.blake2b()
+        pending = []
+        pending_size = 0
+        written = None
+        try:
+            async for chunk in self._stream_body(response):
+                hasher.update(chunk)
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= self.WRITE_BUFFER_SIZE:
+                    if written is not None:
+                        await written
+                    written = await self._queue_write(part.write, pending)
+                    pending = []
+                    pending_size = 0
+            if written is not None:
+                await written
+            written = await self._queue_write(part.finish, pending)
+            await written
+        except BaseException:
+            # Let a queued batch finish before closing the file under it
+            if written is not None:
+                await asyncio.wait([written])
+                if not written.cancelled():
+                    written.exception()
+            part.discard()
+            raise
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _status(response):
+        """
+        HTTP status code of an aiohttp or httpx response
+        
+        Args:
+            response (aiohttp.ClientResponse | httpx.Response): The response
+            
+        Returns:
+            int: Status code
+        """
+        if httpx is not None and isinstance(response, httpx.Response):
+            return response.status_code
+        return response.status
+
+    def _stream_body(self, response):
+        """
+        Iterate over an aiohttp or httpx response body in fixed-size chunks
+        
+        Args:
+            response (aiohttp.ClientResponse | httpx.Response): The response
+            
+        Returns:
+            AsyncIterator[bytes]: Body chunks
+        """
+        if httpx is not None and isinstance(response, httpx.Response):
+            return response.aiter_bytes(self.CHUNK_SIZE)
+        return response.content.iter_chunked(self.CHUNK_SIZE)
+
+    @staticmethod
+    def _retry_delay(response, attempt):
+        """
+        Seconds to wait before retrying a rate-limited (429) or failed (5xx) request
+        
+        Args:
+            response (aiohttp.ClientResponse | httpx.Response): The response to retry
+            attempt (int): Zero-based attempt number
+            
+        Returns:
+            float: Retry-After for 429 responses when given in seconds, otherwise exponential backoff
+        """
+        if ImageDownloader._status(response) == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(int(retry_after), 60)
+        return 2 ** attempt
+
+    async def _download_one(self, session, semaphore, url, filename):
+        """
+        Download a single image asynchronously, retrying on HTTP 429 and 5xx responses
+        
+        Args:
+            session (aiohttp.ClientSession | httpx.AsyncClient): Shared client session
+            semaphore (asyncio.Semaphore): Caps the number of requests in flight
+            url (str): Image URL
+            filename (str): Local filename to save the image
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            filepath = self._folder / filename
+            
+            if self._already_downloaded(url, filename):
+                logger.debug(f"Skipping {filename} - already exists")
+                self.skipped_count += 1
+                return True
+            
+            for attempt in range(self.max_retries):
+                retry_delay = None
+                request = session.stream('GET', url) if self.http2 else session.get(url)
+                async with semaphore, request as response:
+                    status = self._status(response)
+                    if (status == 429 or status >= 500) and attempt < self.max_retries - 1:
+                        retry_delay = self._retry_delay(response, attempt)
+                    else:
+                        response.raise_for_status()
+                        # Save the image as it arrives, without blocking the event loop
+                        digest = await self._save_response_async(response, filepath)
+                if retry_delay is None:
+                    break
+                # Wait outside the semaphore so other downloads keep going
+                logger.warning(f"HTTP {status} for {url}, retrying in {retry_delay}s")
+                await asyncio.sleep(retry_delay)
+            
+            ahash = await self._perceptual_hash_async(filepath) if self.perceptual_dedupe else None
+            self._link_duplicate(filename, self._content_keys(digest, ahash))
+            self._record_download(url, filename)
+            logger.debug(f"Downloaded: {filename}")
+            self.downloaded_count += 1
+            return True
+            
+        except ASYNC_ERRORS as e:
+            logger.error(f"Failed to download {url}: {e}")
+            self.failed_count += 1
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error downloading {url}: {e}")
+            self.failed_count += 1
+            return False
+
+    async def _download_all_async(self, image_data):
+        """
+        Download all images concurrently; the client caps connections in total and per host
+        
+        Args:
+            image_data (list): List of tuples (product_id, image_url, image_order, filename)
+        """
+        if self.http2:
+            # Over HTTP/2 requests to a host share one multiplexed connection
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections_per_host)
+            client = httpx.AsyncClient(http2=True, limits=limits, timeout=30, headers=self.HEADERS,
+                                       follow_redirects=True)
+        else:
+            # Keep resolved addresses for the whole run so new connections skip the resolver
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections_per_host,
+                                             use_dns_cache=True, ttl_dns_cache=3600)
+            timeout = aiohttp.ClientTimeout(total=30)
+            client = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.HEADERS)
+        async with client as session:
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            # Never queue more images than there are workers to hash them
+            self._hash_slots = asyncio.Semaphore(self._hash_workers)
+            self._write_queue = asyncio.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+            writers = [asyncio.create_task(self._write_worker()) for _ in range(self.WRITERS)]
+
+            async def download(image_url, filename):
+                await self._download_one(session, semaphore, image_url, filename)
+                self._image_done()
+
+            try:
+                await asyncio.gather(*(
+                    download(image_url, filename)
+                    for product_id, image_url, image_order, filename in image_data
+                ))
+            finally:
+                for writer in writers:
+                    writer.cancel()
+                await asyncio.gather(*writers, return_exceptions=True)
+                self._write_queue = None
+
     def load_image_urls(self):
         """
         Load image URLs from Excel file
         
         Returns:
-            list: List of tuples (product_id, image_url, image_order)
+            list: List of tuples (product_id, image_url, image_order, filename)
         """
         try:
             logger.info(f"Loading image URLs from {self.excel_file}")
-            df = pd.read_excel(self.excel_file, sheet_name='Images')
+            columns = ['product_id', 'image_url', 'image_order']
+            df = pd.read_excel(self.excel_file, sheet_name='Images', usecols=columns, engine=EXCEL_ENGINE)
             
             # Convert to list of tuples
-            image_data = []
-            for _, row in df.iterrows():
-                image_data.append((
-                    row['product_id'],
-                    row['image_url'],
-                    row['image_order']
-                ))
+            df['filename'] = self.image_filenames(df['image_url'])
+            image_data = list(df[columns + ['filename']].itertuples(index=False, name=None))
             
             self.total_images = len(image_data)
             logger.info(f"Loaded {self.total_images} image URLs")
@@ -139,6 +867,57 @@ class ImageDownloader:
             logger.error(f"Error loading image URLs: {e}")
             return []
 
+    def remove_duplicate_urls(self, image_data):
+        """
+        Drop rows whose image URL already appeared earlier in the list, and give a
+        distinct filename to a different URL that would be saved under a filename already taken
+        
+        Args:
+            image_data (list): List of tuples (product_id, image_url, image_order, filename)
+            
+        Returns:
+            list: The rows with the first occurrence of each URL, each with its own filename
+        """
+        seen_urls = set()
+        seen_filenames = set()
+        unique = []
+        renamed = 0
+        for row in image_data:
+            if row[1] in seen_urls:
+                continue
+            seen_urls.add(row[1])
+            if row[3] in seen_filenames:
+                filename = self._distinct_filename(row[3], row[1], seen_filenames)
+                logger.debug(f"Saving {row[1]} as {filename} - {row[3]} is already taken by another URL")
+                row = row[:3] + (filename,)
+                renamed += 1
+            seen_filenames.add(row[3])
+            unique.append(row)
+        
+        removed = len(image_data) - len(unique)
+        if removed:
+            logger.info(f"Removed {removed} duplicate image URLs")
+        if renamed:
+            logger.info(f"Renamed {renamed} images whose filename is already used by another URL")
+        self.total_images = len(unique)
+        return unique
+
+    @staticmethod
+    def _url_host(url):
+        """
+        Host part of an absolute URL, read from the text without a full urlparse
+        
+        Args:
+            url (str): Image URL
+            
+        Returns:
+            str: 'host[:port]' for 'scheme://host[:port]/...' or '//host/...', otherwise ''
+        """
+        if not isinstance(url, str):
+            return ''
+        parts = url.split('/', 3)
+        return parts[2] if len(parts) > 2 and parts[1] == '' else ''
+
     def download_all_images(self):
         """
         Download all images from the Excel file
@@ -151,28 +930,63 @@ class ImageDownloader:
             logger.error("No image URLs found. Exiting.")
             return False
         
+        image_data = self.remove_duplicate_urls(image_data)
+        # Group requests by host so each host's pooled connections (and TLS sessions) are reused back to back
+        image_data.sort(key=lambda row: self._url_host(row[1]))
+        self._existing_files = self._scan_download_folder()
+        
         logger.info(f"Starting download of {self.total_images} images...")
         
-        # Download each image
-        for i, (product_id, image_url, image_order) in enumerate(image_data, 1):
-            logger.info(f"Processing image {i}/{self.total_images} (Product ID: {product_id}, Order: {image_order})")
-            
-            # Extract filename from URL
-            filename = self.get_image_filename(image_url)
+        if tqdm is not None:
+            self._progress_bar = tqdm(total=self.total_images, unit='img', mininterval=0.5,
+                                      disable=not sys.stderr.isatty())
+        try:
+            # With aiohttp (or httpx for HTTP/2) installed, download concurrently
+            if aiohttp is not None or self.http2:
+                with self._hash_process_pool():
+                    asyncio.run(self._download_all_async(image_data))
+            else:
+                with _dns_cache():
+                    self._download_all_serial(image_data)
+        finally:
+            if self._progress_bar is not None:
+                self._progress_bar.close()
+                self._progress_bar = None
+            self._save_cache()
+        
+        # Print final statistics
+        self.print_statistics()
+        return True
+
+    def _download_all_serial(self, image_data):
+        """
+        Download each image in turn (used when aiohttp is not installed)
+        
+        Args:
+            image_data (list): List of tuples (product_id, image_url, image_order, filename)
+        """
+        for product_id, image_url, image_order, filename in image_data:
+            # Images saved by an earlier run are skipped without a request
+            fetched = not self._already_downloaded(image_url, filename)
             
             # Download the image
             self.download_image(image_url, filename)
+            self._image_done()
             
             # Add small delay to be respectful to the server
-            time.sleep(0.1)
-            
-            # Progress update every 50 images
-            if i % 50 == 0:
-                logger.info(f"Progress: {i}/{self.total_images} images processed")
-        
-        # Print final statistics
-        self.print_statistics()
-        return True
+            if fetched:
+                time.sleep(0.1)
+
+    def _image_done(self):
+        """
+        Count a finished image (downloaded, skipped or failed) towards the progress report
+        """
+        self.completed_count += 1
+        if self._progress_bar is not None:
+            self._progress_bar.update()
+        # Progress update every 50 images
+        if self.completed_count % 50 == 0:
+            logger.info(f"Progress: {self.completed_count}/{self.total_images} images processed")
 
     def print_statistics(self):
         """
@@ -184,6 +998,7 @@ class ImageDownloader:
         logger.info(f"Total images: {self.total_images}")
         logger.info(f"Successfully downloaded: {self.downloaded_count}")
         logger.info(f"Already existed (skipped): {self.skipped_count}")
+        logger.info(f"Duplicates linked to existing files: {self.duplicate_count}")
         logger.info(f"Failed downloads: {self.failed_count}")
         logger.info(f"Success rate: {((self.downloaded_count + self.skipped_count) / self.total_images * 100):.1f}%")
         logger.info(f"Images saved to: {os.path.abspath(self.download_folder)}")
@@ -193,11 +1008,19 @@ def main():
     """
     Main function to run the image downloader
     """
+    _configure_logging()
+    
     print("🖼️  Image Downloader for IGold Scraper")
     print("=" * 50)
     
+    # Optionally also link visually identical images (needs imagehash): --perceptual-dedupe
+    perceptual_dedupe = '--perceptual-dedupe' in sys.argv
+    
+    # Optionally download over HTTP/2 with httpx (needs httpx[http2]): --http2
+    http2 = '--http2' in sys.argv
+    
     # Initialize downloader
-    downloader = ImageDownloader()
+    downloader = ImageDownloader(perceptual_dedupe=perceptual_dedupe, http2=http2)
     
     # Check if Excel file exists
     if not os.path.exists(downloader.excel_file):